@@ -0,0 +1,62 @@
+"""Measure how long ``import newsapi`` and ``from newsapi import NewsApiClient`` take in a fresh interpreter.
+
+Usage::
+
+    $ python benchmarks/import_time.py --runs 20 --budget 0.05
+
+Each run starts a new interpreter, so nothing is cached in ``sys.modules``.  The script prints the median
+time per statement and exits with status 1 if a median exceeds ``--budget`` seconds.
+"""
+from __future__ import print_function
+
+import argparse
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+STATEMENTS = ("import newsapi", "from newsapi import NewsApiClient")
+
+_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+exec(sys.argv[1])
+print(time.perf_counter() - start)
+print("requests" in sys.modules)
+"""
+
+
+def measure(statement):
+    """Time ``statement`` in a fresh interpreter.  Returns ``(seconds, requests_imported)``."""
+    out = subprocess.check_output([sys.executable, "-c", _SNIPPET, statement], cwd=ROOT)
+    seconds, requests_imported = out.decode("ascii").split()
+    return float(seconds), requests_imported == "True"
+
+
+def median(values):
+    values = sorted(values)
+    mid = len(values) // 2
+    return values[mid] if len(values) % 2 else (values[mid - 1] + values[mid]) / 2.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--budget", type=float, default=0.05, help="maximum median seconds per statement")
+    args = parser.parse_args(argv)
+
+    over_budget = False
+    for statement in STATEMENTS:
+        samples = [measure(statement) for _ in range(args.runs)]
+        seconds = median([s for s, _ in samples])
+        print(
+            "%-40s median %7.2f ms  (requests imported: %s)"
+            % (statement, seconds * 1000, "yes" if samples[0][1] else "no")
+        )
+        over_budget = over_budget or seconds > args.budget
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""Profile where :class:`NewsApiClient` calls spend CPU time and memory, against a local stub server.
+
+Usage::
+
+    $ python benchmarks/profile_client.py --calls 200 --page-size 100 --tracemalloc --folded client.folded
+    $ flamegraph.pl client.folded > client.svg
+
+The scenario starts the stub News API from ``tests/stub_server.py`` on localhost and, over one
+``requests.Session``, makes ``--calls`` calls each of ``get_everything`` (``--page-size`` articles per
+response) and ``get_top_headlines``.  Every call is split into the ``validate``, ``transport`` (with
+``auth`` nested in it) and ``decode`` stages by :class:`newsapi.profiling.Profiler`.  The script prints the
+mean wall time, CPU time and net allocations per stage, and writes the ``--metric`` of each stage in
+collapsed-stack format to ``--folded``.  ``--tracemalloc`` adds allocation tracking, which slows every stage
+down, so compare timings with it off.
+"""
+from __future__ import print_function
+
+import argparse
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests  # noqa: E402
+
+from newsapi.newsapi_client import NewsApiClient  # noqa: E402
+from newsapi.profiling import METRICS, Profiler  # noqa: E402
+from tests.stub_server import StubServer  # noqa: E402
+
+
+def run(calls, page_size, profiler):
+    with StubServer() as server, server.patch_urls(), requests.Session() as session:
+        api = NewsApiClient(api_key="benchmark", session=session, profiler=profiler)
+        # Warm up the connection and the JSON decoder outside the profile.
+        api.get_everything(q="warmup", page_size=page_size)
+        profiler.reset()
+        for i in range(calls):
+            api.get_everything(q="bitcoin", page_size=page_size, page=i % 2 + 1)
+            api.get_top_headlines(country="us")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200, help="calls per endpoint")
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--tracemalloc", action="store_true", help="also record allocations per stage")
+    parser.add_argument("--folded", help="write a collapsed-stack profile to this file")
+    parser.add_argument("--metric", choices=METRICS, default="cpu", help="the metric written to --folded")
+    args = parser.parse_args(argv)
+
+    profiler = Profiler(trace_allocations=args.tracemalloc)
+    run(args.calls, args.page_size, profiler)
+    print(profiler.report())
+    if args.folded:
+        with io.open(args.folded, "w", encoding="utf-8") as f:
+            profiler.dump_collapsed(f, metric=args.metric)
+        print("wrote %s profile to %s" % (args.metric, args.folded))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1 +1,21 @@
-from newsapi.newsapi_client import NewsApiClient  # noqa
+import sys
+
+# Submodules are imported on first use, so ``import newsapi`` stays cheap (see PEP 562).
+_LAZY_ATTRIBUTES = {"NewsApiClient": "newsapi.newsapi_client"}
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        if name in _LAZY_ATTRIBUTES:
+            module = __import__(_LAZY_ATTRIBUTES[name], fromlist=[name])
+            value = getattr(module, name)
+            globals()[name] = value
+            return value
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+    def __dir__():
+        return sorted(set(globals()) | set(_LAZY_ATTRIBUTES))
+
+
+else:
+    from newsapi.newsapi_client import NewsApiClient  # noqa
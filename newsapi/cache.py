@@ -0,0 +1,269 @@
+"""Response caching for :class:`NewsApiClient`, with stale-while-revalidate and stale-if-error."""
+from __future__ import unicode_literals
+
+import collections
+import json
+import threading
+import time
+
+from newsapi.newsapi_exception import NewsAPIException
+
+__all__ = ("CacheBackend", "MemoryBackend", "ResponseCache", "cache_key")
+
+# requests.RequestException (timeouts, connection errors) derives from IOError.
+_FALLBACK_ERRORS = (NewsAPIException, IOError, OSError)
+
+
+def cache_key(url, params, article_fields=None):
+    """Return a key for a request that does not depend on parameter order; ``None`` values are dropped.
+
+    Responses projected to ``article_fields`` get their own keys, so clients with different projections
+    can share a cache.
+    """
+    items = sorted((name, value) for name, value in params.items() if value is not None)
+    key = [url, items]
+    if article_fields is not None:
+        key.append(sorted(article_fields))
+    return json.dumps(key, separators=(",", ":"))
+
+
+class CacheBackend(object):
+    """The storage interface used by :class:`ResponseCache`.
+
+    A backend maps string keys to entries, which are ``(stored_at, response)`` tuples.  Subclasses implement
+    :meth:`get`, :meth:`set`, :meth:`delete` and :meth:`clear`, and may override :meth:`get_many`,
+    :meth:`claim` and :meth:`size` when the store can do better than the defaults.
+    """
+
+    def size(self):
+        """Return the number of entries, or ``None`` if counting them is not cheap."""
+        return None
+
+    def get(self, key):
+        """Return the entry for ``key``, or ``None``."""
+        raise NotImplementedError
+
+    def get_many(self, keys):
+        """Return a list with the entry, or ``None``, for each of ``keys``."""
+        return [self.get(key) for key in keys]
+
+    def set(self, key, entry, expires_in):
+        """Store ``entry``; the backend may drop it after ``expires_in`` seconds."""
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def claim(self, key, seconds):
+        """Claim the refresh of ``key`` for ``seconds``; ``False`` if another client holds the claim.
+
+        Backends shared between machines use this so that only one of them refreshes a stale response.
+        """
+        return True
+
+
+class MemoryBackend(CacheBackend):
+    """An in-process LRU backend, safe to share between threads.
+
+    :param max_entries: The number of entries kept; the least recently used are evicted first.
+    :type max_entries: int
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def size(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                # Re-insert to mark the entry as most recently used.
+                self._entries[key] = entry
+            return entry
+
+    def set(self, key, entry, expires_in):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class ResponseCache(object):
+    """A cache of decoded responses, safe to share between threads.
+
+    A response younger than ``ttl`` seconds is fresh and is returned without calling the API.  Up to
+    ``stale_while_revalidate`` seconds after that, it is still returned straight away while a background
+    call refreshes it.  Up to ``stale_if_error`` seconds after ``ttl``, it is returned if calling the API
+    fails with :class:`NewsAPIException` or a network error, such as a timeout.  Background refreshes need
+    a client created with ``shared=True``.
+
+    Responses are kept in memory unless another ``backend`` is given, such as
+    :class:`newsapi.redis_cache.RedisBackend` to share one cache between machines.  With a shared backend,
+    set ``fill_wait`` so that a machine missing a response that another machine is already fetching waits
+    for it rather than calling the API too.
+
+    Cached responses are shared between callers, so treat them as read-only.
+
+    :param ttl: Seconds a response stays fresh.
+    :type ttl: float
+    :param stale_while_revalidate: Seconds past ``ttl`` during which a stale response is served while it is refreshed.
+    :type stale_while_revalidate: float
+    :param stale_if_error: Seconds past ``ttl`` during which a stale response is served if the API call fails.
+    :type stale_if_error: float
+    :param max_entries: The number of responses kept by the default in-memory backend.
+    :type max_entries: int
+    :param backend: Where responses are stored; defaults to a :class:`MemoryBackend` of ``max_entries``.
+    :type backend: CacheBackend or None
+    :param fill_wait: Seconds to wait on a miss for a response being fetched elsewhere, claimed through
+        :meth:`CacheBackend.claim`, before calling the API anyway; ``0`` never waits.
+    :type fill_wait: float
+    """
+
+    def __init__(
+        self, ttl=60, stale_while_revalidate=0, stale_if_error=0, max_entries=1024, backend=None, fill_wait=0
+    ):
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self.max_entries = max_entries
+        self.backend = backend if backend is not None else MemoryBackend(max_entries)
+        self.fill_wait = fill_wait
+        self._refreshing = set()
+        self._counts = {"hits": 0, "stale_hits": 0, "misses": 0, "filled_elsewhere": 0, "stale_on_error": 0}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        size = self.backend.size()
+        if size is None:
+            raise TypeError("%s does not report its size" % type(self.backend).__name__)
+        return size
+
+    def get(self, key):
+        """Return ``(response, age_in_seconds)`` for ``key``, or ``(None, None)`` if it is not cached."""
+        return self._unpack(self.backend.get(key))
+
+    def get_many(self, keys):
+        """Return a ``(response, age_in_seconds)`` tuple for each of ``keys``, in one round trip per server.
+
+        This is for callers that build keys with :func:`cache_key` themselves, for example to find which of a
+        batch of queries are already cached.  Client calls look up their own key one at a time.
+
+        :rtype: list
+        """
+        return [self._unpack(entry) for entry in self.backend.get_many(keys)]
+
+    @staticmethod
+    def _unpack(entry):
+        if entry is None:
+            return None, None
+        stored_at, response = entry
+        return response, time.time() - stored_at
+
+    def set(self, key, response):
+        expires_in = self.ttl + max(self.stale_while_revalidate, self.stale_if_error)
+        self.backend.set(key, (time.time(), response), expires_in)
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        """Return counts of fresh hits, stale hits, misses, and stale responses served because of an error.
+
+        ``entries`` is the number of cached responses, or ``None`` if the backend does not report it.
+
+        :rtype: dict
+        """
+        with self._lock:
+            counts = dict(self._counts)
+        counts["entries"] = self.backend.size()
+        return counts
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def _start_refresh(self, key):
+        """Claim the background refresh of ``key``; ``False`` if one is already running here or elsewhere."""
+        with self._lock:
+            if key in self._refreshing:
+                return False
+            self._refreshing.add(key)
+        if not self.backend.claim(key, self.ttl):
+            self._end_refresh(key)
+            return False
+        return True
+
+    def _end_refresh(self, key):
+        with self._lock:
+            self._refreshing.discard(key)
+
+    def fetch(self, key, fetch, refresh=None):
+        """Return the response for ``key``, calling ``fetch()`` to get or refresh it as the cache policy requires.
+
+        ``refresh``, if given, is called instead of ``fetch`` for background refreshes.
+        """
+        response, age = self.get(key)
+        if response is not None and age < self.ttl:
+            self._count("hits")
+            return response
+        if response is not None and age < self.ttl + self.stale_while_revalidate:
+            self._count("stale_hits")
+            if self._start_refresh(key):
+                thread = threading.Thread(target=self._refresh, args=(key, refresh or fetch))
+                thread.daemon = True
+                thread.start()
+            return response
+
+        self._count("misses")
+        if self.fill_wait and not self.backend.claim("fill:" + key, self.fill_wait):
+            filled = self._wait_for_fill(key)
+            if filled is not None:
+                self._count("filled_elsewhere")
+                return filled
+        try:
+            fresh = fetch()
+        except _FALLBACK_ERRORS:
+            if response is not None and age < self.ttl + self.stale_if_error:
+                self._count("stale_on_error")
+                return response
+            raise
+        self.set(key, fresh)
+        return fresh
+
+    def _wait_for_fill(self, key):
+        """Poll for a fresh response to ``key`` for up to ``fill_wait`` seconds; ``None`` if none arrives."""
+        give_up_at = time.time() + self.fill_wait
+        while time.time() < give_up_at:
+            time.sleep(min(0.05, self.fill_wait))
+            response, age = self.get(key)
+            if response is not None and age < self.ttl:
+                return response
+        return None
+
+    def _refresh(self, key, fetch):
+        try:
+            self.set(key, fetch())
+        except _FALLBACK_ERRORS:
+            # Keep serving the stale response; the next request past the stale window retries in the foreground.
+            pass
+        finally:
+            self._end_refresh(key)
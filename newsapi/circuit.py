@@ -0,0 +1,131 @@
+"""Circuit breakers that stop calling an endpoint while it is failing."""
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from newsapi.concurrency import is_overload
+from newsapi.newsapi_exception import CircuitOpenError
+
+__all__ = ("CircuitBreaker",)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker(object):
+    """A closed/open/half-open circuit breaker for one endpoint.
+
+    While closed, calls go through.  A call fails, for the breaker, if it raises an overload error
+    (a 429, a 5xx or a network error such as a timeout) or takes longer than ``latency_threshold``.
+    After ``failure_threshold`` failures in a row, the breaker opens: calls raise
+    :class:`newsapi.newsapi_exception.CircuitOpenError` straight away.  After ``recovery_timeout``
+    seconds it turns half-open and lets up to ``half_open_probes`` calls through.  If they all succeed, it
+    closes again; if any fails, it opens for another ``recovery_timeout``.
+
+    Pass a factory to :class:`NewsApiClient` to get one breaker per endpoint::
+
+        api = NewsApiClient(api_key=key, circuit_breaker=lambda: CircuitBreaker(failure_threshold=3))
+
+    :param failure_threshold: Consecutive failures that open the breaker.
+    :type failure_threshold: int
+    :param latency_threshold: Seconds after which a successful call still counts as a failure, or ``None``.
+    :type latency_threshold: float or None
+    :param recovery_timeout: Seconds the breaker stays open before probing.
+    :type recovery_timeout: float
+    :param half_open_probes: Probe calls allowed, and needed to succeed, while half-open.
+    :type half_open_probes: int
+    """
+
+    def __init__(self, failure_threshold=5, latency_threshold=None, recovery_timeout=30, half_open_probes=1):
+        if failure_threshold < 1 or half_open_probes < 1:
+            raise ValueError("failure_threshold and half_open_probes should be positive")
+        self.failure_threshold = failure_threshold
+        self.latency_threshold = latency_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_probes = half_open_probes
+
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = None
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._counts = {"trips": 0, "rejected": 0}
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        """``"closed"``, ``"open"`` or ``"half_open"``."""
+        with self._lock:
+            if self._state == OPEN and time.time() - self._opened_at >= self.recovery_timeout:
+                return HALF_OPEN
+            return self._state
+
+    def stats(self):
+        """Return the state, the current run of failures, and how often the breaker tripped and rejected calls.
+
+        :rtype: dict
+        """
+        state = self.state
+        with self._lock:
+            return dict(self._counts, state=state, consecutive_failures=self._failures)
+
+    def call(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` through the breaker.
+
+        :raises CircuitOpenError: If the breaker is open, or half-open with all probes in flight.
+        """
+        probe = self._before_call()
+        start = time.time()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self._after_call(probe, time.time() - start, e)
+            raise
+        self._after_call(probe, time.time() - start, None)
+        return result
+
+    def _before_call(self):
+        """Admit a call or raise.  Returns whether the call is a half-open probe."""
+        with self._lock:
+            now = time.time()
+            if self._state == CLOSED:
+                return False
+            if self._state == OPEN:
+                retry_after = self._opened_at + self.recovery_timeout - now
+                if retry_after > 0:
+                    self._counts["rejected"] += 1
+                    raise CircuitOpenError(retry_after)
+                self._state = HALF_OPEN
+                self._probes_in_flight = self._probe_successes = 0
+            if self._probes_in_flight + self._probe_successes >= self.half_open_probes:
+                self._counts["rejected"] += 1
+                raise CircuitOpenError(0)
+            self._probes_in_flight += 1
+            return True
+
+    def _after_call(self, probe, latency, error):
+        failed = (error is not None and is_overload(error)) or (
+            self.latency_threshold is not None and latency > self.latency_threshold
+        )
+        with self._lock:
+            if probe:
+                self._probes_in_flight -= 1
+                if failed:
+                    self._open()
+                else:
+                    self._probe_successes += 1
+                    if self._probe_successes >= self.half_open_probes:
+                        self._state = CLOSED
+                        self._failures = 0
+            elif self._state == CLOSED:
+                # Results of calls admitted before the breaker opened are ignored once it has.
+                self._failures = self._failures + 1 if failed else 0
+                if self._failures >= self.failure_threshold:
+                    self._open()
+
+    def _open(self):
+        self._state = OPEN
+        self._opened_at = time.time()
+        self._counts["trips"] += 1
@@ -0,0 +1,191 @@
+"""Adaptive concurrency control for running many client calls in parallel."""
+from __future__ import unicode_literals
+
+import threading
+import time
+
+from newsapi.newsapi_exception import DeadlineExceeded, NewsAPIException
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+__all__ = ("AdaptiveLimiter", "is_overload", "run_batch")
+
+
+def is_overload(error):
+    """Return ``True`` if ``error`` signals an overloaded upstream: a 429, a 5xx, or a network failure.
+
+    A :class:`DeadlineExceeded` counts if the server failed to answer before the deadline, since that is a
+    timeout cut short, but not if the deadline passed before the call was sent.
+    """
+    if isinstance(error, DeadlineExceeded):
+        return error.timed_out
+    if isinstance(error, NewsAPIException):
+        status_code = error.status_code or 0
+        code = error.get_exception().get("code") if isinstance(error.get_exception(), dict) else None
+        return status_code == 429 or status_code >= 500 or code == "rateLimited"
+    # requests.RequestException (timeouts, connection errors) derives from IOError.
+    return isinstance(error, (IOError, OSError))
+
+
+class AdaptiveLimiter(object):
+    """An AIMD limit on the number of in-flight requests, driven by observed latency and overload errors.
+
+    While calls succeed with a latency close to the best recently observed, the limit grows by
+    ``increase`` per ``limit`` completed calls (about one step per round of requests).  A rate-limit
+    response, a server error, a network failure, or a latency above ``latency_tolerance`` times the
+    baseline multiplies the limit by ``backoff``.  Only calls started after the last cut can cut it
+    again, so one burst of failures backs off once rather than collapsing the limit to the minimum.
+
+    :param initial_limit: The starting number of concurrent calls.
+    :type initial_limit: int
+    :param min_limit: The limit never drops below this.
+    :type min_limit: int
+    :param max_limit: The limit never grows beyond this.
+    :type max_limit: int
+    :param increase: How much the limit grows per round of successful calls.
+    :type increase: float
+    :param backoff: The factor applied to the limit on overload, between 0 and 1.
+    :type backoff: float
+    :param latency_tolerance: How many times the baseline latency a call may take before it counts as a spike.
+    :type latency_tolerance: float
+    """
+
+    def __init__(self, initial_limit=4, min_limit=1, max_limit=64, increase=1.0, backoff=0.5, latency_tolerance=2.0):
+        if not 1 <= min_limit <= initial_limit <= max_limit:
+            raise ValueError("limits should satisfy 1 <= min_limit <= initial_limit <= max_limit")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff should be between 0 and 1")
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_tolerance = latency_tolerance
+
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        self._baseline = None
+        self._last_cut = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self):
+        """The current concurrency limit."""
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """The number of calls currently running."""
+        return self._in_flight
+
+    @property
+    def baseline_latency(self):
+        """The latency, in seconds, that calls are compared against; ``None`` until a call completes."""
+        return self._baseline
+
+    def acquire(self):
+        """Block until a slot is free, then take it.  Returns a token to pass to :meth:`release`."""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+            return time.time()
+
+    def release(self, token, error=None):
+        """Give back the slot taken by :meth:`acquire` and adjust the limit from the call's outcome.
+
+        :param token: The value returned by :meth:`acquire`.
+        :param error: The exception raised by the call, if any.
+        """
+        now = time.time()
+        latency = now - token
+        with self._cond:
+            self._in_flight -= 1
+            spike = self._is_spike(latency)
+            if error is None:
+                # Spikes are fed in too, or a lasting rise in latency would count as a spike forever.
+                self._update_baseline(latency)
+            if error is None and not spike:
+                self._limit = min(self.max_limit, self._limit + self.increase / self._limit)
+            elif (error is None or is_overload(error)) and token >= self._last_cut:
+                self._limit = max(self.min_limit, self._limit * self.backoff)
+                self._last_cut = now
+            # Other errors (bad parameters, a bad key) say nothing about upstream capacity.
+            self._cond.notify_all()
+
+    def _is_spike(self, latency):
+        return self._baseline is not None and latency > self._baseline * self.latency_tolerance
+
+    def _update_baseline(self, latency):
+        if self._baseline is None or latency < self._baseline:
+            self._baseline = latency
+        else:
+            # Drift slowly upwards so the baseline follows a lasting change in upstream latency.
+            self._baseline += (latency - self._baseline) * 0.05
+
+    def call(self, func, *args, **kwargs):
+        """Run ``func(*args, **kwargs)`` in a slot and feed its outcome back into the limit."""
+        token = self.acquire()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.release(token, e)
+            raise
+        self.release(token)
+        return result
+
+
+def _drain(pending, func, limiter, results, failed, deadline):
+    while True:
+        try:
+            index, kwargs = pending.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            if deadline is not None:
+                # Calls still queued when the deadline passes fail without being sent.
+                deadline.check()
+                kwargs = dict(kwargs, deadline=deadline)
+            results[index] = limiter.call(func, **kwargs)
+        except Exception as e:
+            results[index] = e
+            failed.append(index)
+
+
+def run_batch(func, calls, limiter=None, return_exceptions=False, deadline=None):
+    """Run ``func(**kwargs)`` for every ``kwargs`` in ``calls`` on a pool of threads gated by ``limiter``.
+
+    :param func: The client method to call, such as :meth:`NewsApiClient.get_everything`.
+    :param calls: A list of keyword-argument dicts, one per call.
+    :param limiter: The :class:`AdaptiveLimiter` to use.  A new one with default settings is used if omitted.
+    :param return_exceptions: If ``True``, a failed call's exception is put in its place in the result list.
+        Otherwise the first failure is raised once every call has finished.
+    :param deadline: A :class:`newsapi.deadline.Deadline` for the whole batch.  It is passed on to every call,
+        and calls not yet started when it passes fail with :class:`DeadlineExceeded`.
+    :return: The results, in the order of ``calls``.
+    :rtype: list
+    """
+    if limiter is None:
+        limiter = AdaptiveLimiter()
+    calls = list(calls)
+    results = [None] * len(calls)
+    failed = []
+    pending = queue.Queue()
+    for index, kwargs in enumerate(calls):
+        pending.put((index, kwargs))
+
+    threads = [
+        threading.Thread(target=_drain, args=(pending, func, limiter, results, failed, deadline))
+        for _ in range(min(limiter.max_limit, len(calls)))
+    ]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    if failed and not return_exceptions:
+        raise results[min(failed)]
+    return results
@@ -1,11 +1,19 @@
-"""Constants and allowed parameter values specified in the News API."""
+"""Constants and allowed parameter values specified in the News API.
+
+The collections are immutable: sets are frozensets and mappings are read-only views.
+"""
+try:
+    from types import MappingProxyType
+except ImportError:  # Python 2
+    MappingProxyType = dict
+
 TOP_HEADLINES_URL = "https://newsapi.org/v2/top-headlines"
 EVERYTHING_URL = "https://newsapi.org/v2/everything"
 SOURCES_URL = "https://newsapi.org/v2/sources"
 
 #: The 2-letter ISO 3166-1 code of the country you want to get headlines for.  If not specified,
 #: the results span all countries.
-COUNTRIES = {
+COUNTRIES = frozenset({
     "ae",
     "ar",
     "at",
@@ -60,9 +68,9 @@ COUNTRIES = {
     "us",
     "ve",
     "za",
-}
+})
 
-DEFAULT_LANGUAGES = {
+DEFAULT_LANGUAGES = MappingProxyType({
     "ae": "ar",
     "ar": "es",
     "at": "de",
@@ -117,16 +125,15 @@ DEFAULT_LANGUAGES = {
     "us": "en",
     "ve": "es",
     "za": "zu",
-}
+})
 
 #: The 2-letter ISO-639-1 code of the language you want to get articles for.  If not specified,
 #: the results span all languages.
-LANGUAGES = {"ar", "de", "en", "es", "fr", "he", "it", "nl", "no", "pt", "ru", "sv", "ud", "zh"}
+LANGUAGES = frozenset({"ar", "de", "en", "es", "fr", "he", "it", "nl", "no", "pt", "ru", "sv", "ud", "zh"})
 
 #: The category you want to get articles for.  If not specified,
 #: the results span all categories.
-CATEGORIES = {"business", "entertainment", "general", "health", "science", "sports", "technology"}
+CATEGORIES = frozenset({"business", "entertainment", "general", "health", "science", "sports", "technology"})
 
 #: The order to sort article results in.  If not specified, the default is ``"publishedAt"``.
-SORT_METHOD = {"relevancy", "popularity", "publishedAt"}
-
+SORT_METHOD = frozenset({"relevancy", "popularity", "publishedAt"})
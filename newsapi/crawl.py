@@ -0,0 +1,294 @@
+"""Sharded backfill crawler for the `/everything` endpoint.
+
+A backfill is split into shards, one per date window and group of sources, and the shards are
+spread over a pool of worker processes.  Each shard writes its articles to its own NDJSON file
+alongside a small checkpoint, so an interrupted crawl can be re-run with the same arguments and
+will resume after the last completed page.
+
+Run ``python -m newsapi.crawl --help`` for usage.
+"""
+from __future__ import print_function, unicode_literals
+
+import argparse
+import datetime
+import io
+import json
+import multiprocessing
+import os
+import sys
+
+from newsapi.newsapi_exception import NewsAPIException
+from newsapi.pagination import MAX_PAGE_SIZE, iter_pages
+from newsapi.utils import DATETIME_FMT, stringify_date_param
+
+__all__ = ("Shard", "plan_shards", "run_shard", "crawl", "main")
+
+
+class Shard(object):
+    """A unit of crawl work: one date window for one group of sources.
+
+    :param shard_id: A name that is unique within the plan; used to name the output files.
+    :type shard_id: str
+
+    :param params: Keyword arguments for :meth:`NewsApiClient.get_everything`, without paging.
+    :type params: dict
+    """
+
+    def __init__(self, shard_id, params):
+        self.shard_id = shard_id
+        self.params = params
+
+    def __repr__(self):
+        return "Shard(%r, %r)" % (self.shard_id, self.params)
+
+    def __eq__(self, other):
+        return isinstance(other, Shard) and (self.shard_id, self.params) == (other.shard_id, other.params)
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def _parse_date(value):
+    # Careful: datetime.datetime is subclass of datetime.date!
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.datetime.strptime(stringify_date_param(value)[:10], "%Y-%m-%d").date()
+
+
+def plan_shards(from_date, to_date, window_days=1, sources=None, sources_per_shard=1, **params):
+    """Split a backfill into :class:`Shard` objects.
+
+    The span from ``from_date`` up to and including ``to_date`` is cut into windows of ``window_days``
+    days, and ``sources`` (if given) into groups of ``sources_per_shard``.  One shard is planned for
+    every combination.  The plan is deterministic, so re-running it with the same arguments yields the
+    same shard IDs, which is what lets a crawl resume.
+
+    :param from_date: The first day to crawl.
+    :type from_date: str or datetime.date
+    :param to_date: The last day to crawl.
+    :type to_date: str or datetime.date
+    :param window_days: The number of days covered by each shard.
+    :type window_days: int
+    :param sources: Source identifiers to spread over shards.
+    :type sources: list(str) or None
+    :param sources_per_shard: The number of sources per shard.
+    :type sources_per_shard: int
+    :param params: Further keyword arguments for :meth:`NewsApiClient.get_everything`, such as ``q``.
+    :rtype: list(Shard)
+    """
+    start, end = _parse_date(from_date), _parse_date(to_date)
+    if end < start:
+        raise ValueError("to_date should not be earlier than from_date")
+    if window_days < 1 or sources_per_shard < 1:
+        raise ValueError("window_days and sources_per_shard should be positive")
+
+    source_groups = [None]
+    if sources:
+        source_groups = [",".join(sources[i:i + sources_per_shard]) for i in range(0, len(sources), sources_per_shard)]
+
+    shards = []
+    window = datetime.timedelta(days=window_days)
+    while start <= end:
+        stop = min(start + window, end + datetime.timedelta(days=1))
+        window_params = dict(
+            params,
+            from_param=datetime.datetime.combine(start, datetime.time()).strftime(DATETIME_FMT),
+            to=(datetime.datetime.combine(stop, datetime.time()) - datetime.timedelta(seconds=1)).strftime(
+                DATETIME_FMT
+            ),
+        )
+        for group in source_groups:
+            shard_params = dict(window_params)
+            if group is not None:
+                shard_params["sources"] = group
+            shards.append(Shard("%05d" % len(shards), shard_params))
+        start = stop
+    return shards
+
+
+def _checkpoint_path(output_dir, shard):
+    return os.path.join(output_dir, "shard-%s.checkpoint.json" % shard.shard_id)
+
+
+def _output_path(output_dir, shard):
+    return os.path.join(output_dir, "shard-%s.ndjson" % shard.shard_id)
+
+
+def _load_checkpoint(output_dir, shard, page_size):
+    path = _checkpoint_path(output_dir, shard)
+    if not os.path.exists(path):
+        return {"params": shard.params, "page_size": page_size, "page": 0, "offset": 0, "articles": 0, "done": False}
+    with io.open(path, encoding="utf-8") as f:
+        checkpoint = json.load(f)
+    if checkpoint["params"] != shard.params:
+        raise ValueError("checkpoint for shard %s was written by a different crawl plan" % shard.shard_id)
+    # Page numbers only line up with the articles already written if the page size is the same.
+    if checkpoint["page_size"] != page_size:
+        raise ValueError(
+            "checkpoint for shard %s was written with page_size=%d" % (shard.shard_id, checkpoint["page_size"])
+        )
+    return checkpoint
+
+
+def _save_checkpoint(output_dir, shard, checkpoint):
+    path = _checkpoint_path(output_dir, shard)
+    tmp_path = path + ".tmp"
+    with io.open(tmp_path, "wb") as f:
+        f.write(json.dumps(checkpoint, sort_keys=True).encode("utf-8"))
+    getattr(os, "replace", os.rename)(tmp_path, path)
+
+
+def run_shard(client, shard, output_dir, page_size=MAX_PAGE_SIZE, max_pages=None):
+    """Crawl one shard with ``client``, resuming from its checkpoint if there is one.
+
+    Articles are appended to ``shard-<id>.ndjson`` in ``output_dir``.  The checkpoint is updated
+    after every page with the byte offset of the output file, and anything past that offset is
+    truncated on resume, so a page is never written twice.  A shard must be resumed with the same
+    ``page_size``; a larger ``max_pages`` continues a shard that stopped at the old limit.
+
+    :return: A summary with the shard ID, the number of pages fetched by this call, and the
+        number of articles written for the shard in total.
+    :rtype: dict
+    """
+    checkpoint = _load_checkpoint(output_dir, shard, page_size)
+    summary = {"shard": shard.shard_id, "pages": 0, "articles": checkpoint["articles"]}
+    if checkpoint["done"]:
+        return summary
+
+    with io.open(_output_path(output_dir, shard), "ab") as out:
+        out.truncate(checkpoint["offset"])
+        out.seek(checkpoint["offset"])
+        pages = iter_pages(
+            client.get_everything,
+            page_size=page_size,
+            start_page=checkpoint["page"] + 1,
+            max_pages=max_pages,
+            **shard.params
+        )
+        for page, response in pages:
+            articles = response.get("articles") or []
+            for article in articles:
+                out.write(json.dumps(article, sort_keys=True).encode("utf-8") + b"\n")
+            out.flush()
+
+            checkpoint.update(page=page, offset=out.tell(), articles=checkpoint["articles"] + len(articles))
+            _save_checkpoint(output_dir, shard, checkpoint)
+            summary["pages"] += 1
+
+    # A shard cut short by max_pages is not done: a later run with a larger limit picks it up.
+    checkpoint["done"] = max_pages is None or checkpoint["page"] < max_pages
+    _save_checkpoint(output_dir, shard, checkpoint)
+    summary["articles"] = checkpoint["articles"]
+    return summary
+
+
+# Per-process client, created once by the pool initializer so each worker reuses its connections.
+_worker_client = None
+
+
+def _init_worker(api_key):
+    global _worker_client
+    import requests
+
+    from newsapi.newsapi_client import NewsApiClient
+
+    _worker_client = NewsApiClient(api_key=api_key, session=requests.Session())
+
+
+def _crawl_shard(task):
+    shard, output_dir, page_size, max_pages = task
+    try:
+        return run_shard(_worker_client, shard, output_dir, page_size=page_size, max_pages=max_pages)
+    except NewsAPIException as e:
+        return {"shard": shard.shard_id, "error": e.get_exception()}
+    except Exception as e:
+        # Report the failure for this shard only, so the rest of the crawl still runs.
+        return {"shard": shard.shard_id, "error": "%s: %s" % (type(e).__name__, e)}
+
+
+def crawl(api_key, shards, output_dir, processes=None, page_size=MAX_PAGE_SIZE, max_pages=None):
+    """Crawl ``shards`` over a pool of ``processes`` worker processes.
+
+    Each worker runs its own :class:`NewsApiClient` with a dedicated :class:`requests.Session`.
+
+    :return: An iterator of per-shard summaries, in completion order.  A shard that failed has
+        an ``"error"`` key instead of counts; re-run the crawl to retry it.
+    """
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+
+    pool = multiprocessing.Pool(processes=processes, initializer=_init_worker, initargs=(api_key,))
+    try:
+        tasks = [(shard, output_dir, page_size, max_pages) for shard in shards]
+        for summary in pool.imap_unordered(_crawl_shard, tasks):
+            yield summary
+        pool.close()
+    finally:
+        pool.terminate()
+        pool.join()
+
+
+def _build_parser():
+    parser = argparse.ArgumentParser(
+        prog="python -m newsapi.crawl", description="Backfill the /everything endpoint into sharded NDJSON files."
+    )
+    parser.add_argument("--api-key", default=os.environ.get("news_api_secret"), help="defaults to $news_api_secret")
+    parser.add_argument("--q", help="keywords or a phrase to search for")
+    parser.add_argument("--sources", help="comma-separated source identifiers to spread over shards")
+    parser.add_argument("--sources-per-shard", type=int, default=1)
+    parser.add_argument("--domains", help="comma-separated domains to restrict the search to")
+    parser.add_argument("--language")
+    parser.add_argument("--sort-by")
+    parser.add_argument("--from", dest="from_date", required=True, help="first day to crawl, YYYY-MM-DD")
+    parser.add_argument("--to", dest="to_date", required=True, help="last day to crawl, YYYY-MM-DD")
+    parser.add_argument("--window-days", type=int, default=1, help="days covered by each shard")
+    parser.add_argument("--page-size", type=int, default=MAX_PAGE_SIZE)
+    parser.add_argument("--max-pages", type=int, help="last page to fetch for each shard")
+    parser.add_argument("--processes", type=int, help="worker processes; defaults to the CPU count")
+    parser.add_argument("--output", required=True, help="directory for NDJSON shards and checkpoints")
+    return parser
+
+
+def main(argv=None):
+    args = _build_parser().parse_args(argv)
+    if not args.api_key:
+        print("an API key is required: pass --api-key or set $news_api_secret", file=sys.stderr)
+        return 2
+
+    params = {}
+    for name in ("q", "domains", "language", "sort_by"):
+        if getattr(args, name) is not None:
+            params[name] = getattr(args, name)
+    sources = args.sources.split(",") if args.sources else None
+    shards = plan_shards(
+        args.from_date,
+        args.to_date,
+        window_days=args.window_days,
+        sources=sources,
+        sources_per_shard=args.sources_per_shard,
+        **params
+    )
+
+    failed = 0
+    for done, summary in enumerate(
+        crawl(args.api_key, shards, args.output, args.processes, args.page_size, args.max_pages), 1
+    ):
+        if "error" in summary:
+            failed += 1
+            print(
+                "[%d/%d] shard %s failed: %s" % (done, len(shards), summary["shard"], summary["error"]),
+                file=sys.stderr,
+            )
+        else:
+            print(
+                "[%d/%d] shard %s: %d pages, %d articles"
+                % (done, len(shards), summary["shard"], summary["pages"], summary["articles"]),
+                file=sys.stderr,
+            )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,60 @@
+"""Deadlines that bound the total time spent on one or more client calls."""
+from __future__ import unicode_literals
+
+import time
+
+from newsapi.newsapi_exception import DeadlineExceeded
+
+__all__ = ("Deadline",)
+
+try:
+    _clock = time.monotonic
+except AttributeError:  # Python 2
+    _clock = time.time
+
+
+class Deadline(object):
+    """A point in time by which work has to be done.
+
+    Pass the same deadline to every call made on behalf of one piece of work, such as one request to your
+    own service.  Each call's timeouts are then cut to the time that is left, and a call made after the
+    deadline has passed raises :class:`newsapi.newsapi_exception.DeadlineExceeded` without being sent.
+
+    A deadline is not a hard limit on a call in progress.  The connect and read timeouts are each cut to the
+    time left, and requests applies the read timeout to every read from the socket, not to the whole response.
+    A call can therefore finish up to about twice the remaining time later, or later still if the server sends
+    the body slowly.  Its response is then discarded and it raises ``DeadlineExceeded``.
+
+    :param seconds: Seconds from now until the deadline.
+    :type seconds: float
+    """
+
+    def __init__(self, seconds):
+        self.expires_at = _clock() + seconds
+
+    def __repr__(self):
+        return "Deadline(remaining=%.3f)" % self.remaining()
+
+    def remaining(self):
+        """Seconds left, never negative."""
+        return max(0.0, self.expires_at - _clock())
+
+    def expired(self):
+        return _clock() >= self.expires_at
+
+    def check(self):
+        """Raise :class:`DeadlineExceeded` if the deadline has passed."""
+        if self.expired():
+            raise DeadlineExceeded()
+
+    def clamp(self, timeout):
+        """Cut ``timeout``, a number or a ``(connect, read)`` tuple as accepted by requests, to the time left.
+
+        :raises DeadlineExceeded: If no time is left, since requests rejects a timeout of zero.
+        """
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded()
+        if isinstance(timeout, tuple):
+            return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+        return remaining if timeout is None else min(timeout, remaining)
@@ -0,0 +1,93 @@
+"""Change feeds between consecutive snapshots of a ranked article list, such as top headlines."""
+from __future__ import unicode_literals
+
+import collections
+
+__all__ = ("ADDED", "REMOVED", "MOVED", "DiffEvent", "SnapshotDiffer", "diff_snapshot", "fingerprint")
+
+ADDED = "added"
+REMOVED = "removed"
+MOVED = "moved"
+
+#: One change between two snapshots.  ``rank`` and ``previous_rank`` count from 1 and are ``None`` where the
+#: article is absent; ``article`` is the new article dict, or ``None`` for a removal.
+DiffEvent = collections.namedtuple("DiffEvent", ("kind", "url", "rank", "previous_rank", "article"))
+
+
+def _ranked(articles):
+    """Yield ``(rank, url, article)``, skipping articles without a URL and repeats of a URL already seen."""
+    seen = set()
+    rank = 0
+    for article in articles:
+        url = article.get("url")
+        if not url or url in seen:
+            continue
+        seen.add(url)
+        rank += 1
+        yield rank, url, article
+
+
+def fingerprint(articles):
+    """Return the compact form of a snapshot that later ones are compared with: a dict of URL to rank.
+
+    :param articles: The ``articles`` list of a response.
+    :rtype: dict
+    """
+    return {url: rank for rank, url, _ in _ranked(articles)}
+
+
+def diff_snapshot(previous, articles):
+    """Compare ``articles`` with the fingerprint of the previous snapshot, in time linear in their sizes.
+
+    Articles are matched by URL.  Events for the new snapshot come first, in rank order, followed by the
+    removals.
+
+    :param previous: The :func:`fingerprint` of the previous snapshot.
+    :type previous: dict
+    :param articles: The ``articles`` list of the new snapshot.
+    :return: The list of :class:`DiffEvent`, and the fingerprint of the new snapshot.
+    :rtype: tuple(list, dict)
+    """
+    events = []
+    current = {}
+    for rank, url, article in _ranked(articles):
+        current[url] = rank
+        previous_rank = previous.get(url)
+        if previous_rank is None:
+            events.append(DiffEvent(ADDED, url, rank, None, article))
+        elif previous_rank != rank:
+            events.append(DiffEvent(MOVED, url, rank, previous_rank, article))
+    for url, previous_rank in previous.items():
+        if url not in current:
+            events.append(DiffEvent(REMOVED, url, None, previous_rank, None))
+    return events, current
+
+
+class SnapshotDiffer(object):
+    """Turns a stream of snapshots per feed into change events, keeping only a fingerprint of each feed.
+
+    A feed is any hashable key, such as a ``(country, category)`` tuple::
+
+        differ = SnapshotDiffer()
+        for event in differ.update(("us", "business"), api.get_top_headlines(country="us", category="business")):
+            print(event.kind, event.url)
+
+    The first snapshot of a feed reports every article as added.
+
+    :param fingerprints: Fingerprints saved from :attr:`fingerprints`, to resume after a restart.
+    :type fingerprints: dict or None
+    """
+
+    def __init__(self, fingerprints=None):
+        #: The fingerprint of the latest snapshot of each feed.
+        self.fingerprints = dict(fingerprints or {})
+
+    def update(self, feed, response):
+        """Record a new snapshot of ``feed`` and return the :class:`DiffEvent` list since the previous one.
+
+        :param response: A response dict, or its ``articles`` list.
+        :rtype: list
+        """
+        articles = (response.get("articles") or []) if isinstance(response, dict) else response
+        events, self.fingerprints[feed] = diff_snapshot(self.fingerprints.get(feed, {}), articles)
+        return events
@@ -1,8 +1,6 @@
-from requests.auth import AuthBase
-
-
-class NewsApiAuth(AuthBase):
+class NewsApiAuth(object):
     # Provided by newsapi: https://newsapi.org/docs/authentication
+    # requests accepts any callable as ``auth``; not deriving from requests.auth.AuthBase avoids importing requests.
     def __init__(self, api_key):
         self.api_key = api_key
 
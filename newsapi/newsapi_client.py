@@ -1,14 +1,25 @@
 from __future__ import unicode_literals
 
-import requests
+import collections
+import functools
+import threading
 
 from newsapi import const
+from newsapi.cache import cache_key
 from newsapi.newsapi_auth import NewsApiAuth
-from newsapi.newsapi_exception import NewsAPIException
+from newsapi.newsapi_exception import DeadlineExceeded, NewsAPIException
+from newsapi.profiling import profiled
+from newsapi.transfer import accept_encoding, article_projection, transfer_stats
 from newsapi.utils import (
-    is_valid_string, is_valid_string_or_list, stringify_date_param
+    is_valid_string, is_valid_string_or_list, stringify_date_param, validate_timeout
 )
 
+HTTP_OK = 200
+
+
+class _LocalState(object):
+    """Per-call state of a client that is not shared between threads."""
+
 
 class NewsApiClient(object):
     """The core client object used to fetch data from News API endpoints.
@@ -20,19 +31,243 @@ class NewsApiClient(object):
     :param session: An optional :class:`requests.Session` instance from which to execute requests.
         **Note**: If you provide a ``session`` instance, :class:`NewsApiClient` will *not* close the session
         for you.  Remember to call ``session.close()``, or use the session as a context manager, to close
-        the socket and free up resources.
+        the socket and free up resources.  A transport from :mod:`newsapi.transport` can be passed here too,
+        to record or replay traffic.
     :type session: `requests.Session <https://2.python-requests.org/en/master/user/advanced/#session-objects>`_ or None
+
+    :param article_fields: If given, only these keys are kept in each returned article, for example
+        ``("title", "url", "publishedAt")``.  Unused fields such as ``content`` and ``urlToImage`` are then
+        dropped while the response is decoded.  By default, articles are returned in full.
+    :type article_fields: iterable of str or None
+
+    :param shared: Set to ``True`` to share one client between threads.  Each call then borrows a session from
+        a pool that grows to the peak number of concurrent calls, so no session is ever used by two threads at
+        once.  The pooled sessions are closed by :meth:`close`.  A shared client is safe to use from any number
+        of threads.  By default, the client makes no such guarantee.
+    :type shared: bool
+
+    :param session_factory: For a shared client, a callable that returns a new session; defaults to
+        :class:`requests.Session`.
+    :type session_factory: callable or None
+
+    :param cache: An optional :class:`newsapi.cache.ResponseCache`.  Responses are then served from it while
+        fresh and, if the cache allows it, while stale: immediately with a background refresh, or as a
+        fallback when the API fails or times out.  A cache with ``stale_while_revalidate`` refreshes responses from
+        another thread, so it needs ``shared=True``.
+    :type cache: newsapi.cache.ResponseCache or None
+
+    :param timeout: Seconds to wait for the server, as a single number or a ``(connect, read)`` tuple.
+        Every method also takes a ``timeout``, which overrides this one, and a ``deadline``
+        (a :class:`newsapi.deadline.Deadline`) that caps the timeouts to the time it has left.  requests applies
+        the connect and read timeouts separately, and the read timeout to each read from the socket, so a call can
+        run past its deadline, by up to the time that was left or longer against a server that sends the body
+        slowly.  A response that arrives after the deadline raises
+        :class:`newsapi.newsapi_exception.DeadlineExceeded`, but the call is not interrupted sooner.
+    :type timeout: float or tuple(float, float)
+
+    :param circuit_breaker: An optional callable, such as :class:`newsapi.circuit.CircuitBreaker`, that returns a
+        new circuit breaker.  Each endpoint then gets its own breaker, and calls to an endpoint that keeps failing
+        raise :class:`newsapi.newsapi_exception.CircuitOpenError` without reaching the API.
+    :type circuit_breaker: callable or None
+
+    :param profiler: An optional :class:`newsapi.profiling.Profiler` that records the time and memory each call
+        spends validating parameters, in ``requests`` and the auth hook, and decoding the response.
+    :type profiler: newsapi.profiling.Profiler or None
     """
 
-    def __init__(self, api_key, session=None):
+    def __init__(
+        self,
+        api_key,
+        session=None,
+        article_fields=None,
+        shared=False,
+        session_factory=None,
+        cache=None,
+        timeout=30,
+        circuit_breaker=None,
+        profiler=None,
+    ):
         self.auth = NewsApiAuth(api_key=api_key)
-        if session is None:
-            self.request_method = requests
+        self.cache = cache
+        self.profiler = profiler
+        validate_timeout(timeout)
+        self.timeout = timeout
+        # Without a session, ``requests`` itself is used; it is imported on the first call to keep imports fast.
+        self.request_method = session
+
+        self.object_hook = None
+        self.article_fields = None
+        if article_fields is not None:
+            if is_valid_string(article_fields) or not is_valid_string_or_list(list(article_fields)):
+                raise TypeError("article_fields param should be an iterable of str")
+            self.article_fields = tuple(sorted(set(article_fields)))
+            self.object_hook = article_projection(self.article_fields)
+
+        # Everything above is read-only after construction, so request threads read it without locking.
+        # Per-call state lives in ``_local``, which is thread-local in shared mode.
+        self.shared = shared
+        self.session_factory = session_factory
+        if cache is not None and cache.stale_while_revalidate and not shared:
+            raise ValueError("a cache with stale_while_revalidate refreshes in the background; pass shared=True")
+        if shared:
+            if session is not None:
+                raise ValueError("cannot share a single session between threads; pass session_factory instead")
+            self._local = threading.local()
+        else:
+            self._local = _LocalState()
+        self._lock = threading.Lock()
+        self._idle_sessions = collections.deque()
+        self._owned_sessions = []
+        self._totals = {"calls": 0, "wire_bytes": 0, "decoded_bytes": 0}
+        self.circuit_breaker = circuit_breaker
+        #: The circuit breaker of each endpoint URL called so far.
+        self.circuit_breakers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Close the sessions created by a shared client.  A ``session`` passed in by the caller is left open."""
+        with self._lock:
+            sessions, self._owned_sessions = self._owned_sessions, []
+            self._idle_sessions.clear()
+        for session in sessions:
+            session.close()
+
+    @property
+    def last_transfer(self):
+        """:class:`newsapi.transfer.TransferStats` for the most recent response, or ``None`` before the first call.
+
+        For a shared client, this is the most recent response received by the calling thread.
+        """
+        return getattr(self._local, "last_transfer", None)
+
+    def transfer_totals(self):
+        """Return the number of calls made and their summed wire and decoded body sizes, across all threads.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict(self._totals)
+
+    def _checkout_session(self):
+        if not self.shared:
+            if self.request_method is None:
+                import requests
+
+                self.request_method = requests
+            return self.request_method
+
+        # deque.pop() and deque.append() are atomic, so taking and returning idle sessions needs no lock.
+        try:
+            return self._idle_sessions.pop()
+        except IndexError:
+            pass
+        factory = self.session_factory
+        if factory is None:
+            import requests
+
+            factory = requests.Session
+        session = factory()
+        with self._lock:
+            self._owned_sessions.append(session)
+        return session
+
+    def _checkin_session(self, session):
+        if self.shared:
+            self._idle_sessions.append(session)
+
+    def _request(self, url, payload, timeout=None, deadline=None):
+        if self.profiler is not None:
+            self.profiler.end("validate")
+        if timeout is None:
+            timeout = self.timeout
         else:
-            self.request_method = session
+            validate_timeout(timeout)
+
+        if self.cache is None:
+            return self._fetch(url, payload, timeout, deadline)
+        # A background refresh outlives the caller, so it is not bound by the caller's deadline.
+        refresh = functools.partial(self._fetch, url, payload, timeout)
+        if self.profiler is not None:
+            refresh = self.profiler.wrap("refresh", refresh)
+        return self.cache.fetch(
+            cache_key(url, payload, self.article_fields),
+            lambda: self._fetch(url, payload, timeout, deadline),
+            refresh=refresh,
+        )
+
+    def _breaker(self, url):
+        breaker = self.circuit_breakers.get(url)
+        if breaker is None:
+            with self._lock:
+                breaker = self.circuit_breakers.get(url)
+                if breaker is None:
+                    breaker = self.circuit_breakers[url] = self.circuit_breaker()
+        return breaker
+
+    def _fetch(self, url, payload, timeout, deadline=None):
+        if deadline is not None:
+            deadline.check()
+            timeout = deadline.clamp(timeout)
+
+        if self.circuit_breaker is None:
+            return self._send(url, payload, timeout, deadline)
+        return self._breaker(url).call(self._send, url, payload, timeout, deadline)
+
+    def _send(self, url, payload, timeout, deadline):
+        profiler = self.profiler
+        auth = self.auth if profiler is None else profiler.wrap("auth", self.auth)
+        session = self._checkout_session()
+        try:
+            if profiler is not None:
+                profiler.begin("transport")
+            r = session.get(
+                url, auth=auth, timeout=timeout, params=payload, headers={"Accept-Encoding": accept_encoding()}
+            )
+        except IOError:
+            # A timeout cut short by the deadline is reported as the deadline passing.
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded("deadline exceeded waiting for the server", timed_out=True)
+            raise
+        finally:
+            if profiler is not None:
+                profiler.end("transport")
+            self._checkin_session(session)
+        stats = self._local.last_transfer = transfer_stats(r)
+        with self._lock:
+            self._totals["calls"] += 1
+            self._totals["wire_bytes"] += stats.wire_bytes
+            self._totals["decoded_bytes"] += stats.decoded_bytes
+        # requests applies the read timeout to each socket read, so a response can still arrive after the deadline.
+        if deadline is not None and deadline.expired():
+            raise DeadlineExceeded("deadline exceeded before the response was read", timed_out=True)
+
+        # Check Status of Request
+        if r.status_code != HTTP_OK:
+            raise NewsAPIException(r.json(), status_code=r.status_code)
 
+        if profiler is None:
+            return r.json(object_hook=self.object_hook)
+        with profiler.stage("decode"):
+            return r.json(object_hook=self.object_hook)
+
+    @profiled
     def get_top_headlines(  # noqa: C901
-        self, q=None, qintitle=None, sources=None, language=None, country=None, category=None, page_size=None, page=None
+        self,
+        q=None,
+        qintitle=None,
+        sources=None,
+        language=None,
+        country=None,
+        category=None,
+        page_size=None,
+        page=None,
+        timeout=None,
+        deadline=None,
     ):
         """Call the `/top-headlines` endpoint.
 
@@ -81,9 +316,17 @@ class NewsApiClient(object):
             20 is the default, 100 is the maximum.
         :type page: int or None
 
+        :param timeout: Overrides the client's ``timeout`` for this call.
+        :type timeout: float or tuple(float, float) or None
+
+        :param deadline: Bounds this call; see :class:`newsapi.deadline.Deadline`.
+        :type deadline: newsapi.deadline.Deadline or None
+
         :return: JSON response as nested Python dictionary.
         :rtype: dict
         :raises NewsAPIException: If the ``"status"`` value of the response is ``"error"`` rather than ``"ok"``.
+        :raises DeadlineExceeded: If ``deadline`` passes before the response arrives.
+        :raises CircuitOpenError: If the client has a ``circuit_breaker`` and the endpoint's breaker is open.
         """
 
         payload = {}
@@ -166,14 +409,9 @@ class NewsApiClient(object):
         if payload.get("language") is None:
             payload["language"] = const.DEFAULT_LANGUAGES.get(country)
         # Send Request
-        r = self.request_method.get(const.TOP_HEADLINES_URL, auth=self.auth, timeout=30, params=payload)
-
-        # Check Status of Request
-        if r.status_code != requests.codes.ok:
-            raise NewsAPIException(r.json())
-
-        return r.json()
+        return self._request(const.TOP_HEADLINES_URL, payload, timeout, deadline)
 
+    @profiled
     def get_everything(  # noqa: C901
         self,
         q=None,
@@ -187,6 +425,8 @@ class NewsApiClient(object):
         sort_by=None,
         page=None,
         page_size=None,
+        timeout=None,
+        deadline=None,
     ):
         """Call the `/everything` endpoint.
 
@@ -241,9 +481,17 @@ class NewsApiClient(object):
             greater than the page size.
         :type page_size: int or None
 
+        :param timeout: Overrides the client's ``timeout`` for this call.
+        :type timeout: float or tuple(float, float) or None
+
+        :param deadline: Bounds this call; see :class:`newsapi.deadline.Deadline`.
+        :type deadline: newsapi.deadline.Deadline or None
+
         :return: JSON response as nested Python dictionary.
         :rtype: dict
         :raises NewsAPIException: If the ``"status"`` value of the response is ``"error"`` rather than ``"ok"``.
+        :raises DeadlineExceeded: If ``deadline`` passes before the response arrives.
+        :raises CircuitOpenError: If the client has a ``circuit_breaker`` and the endpoint's breaker is open.
         """
 
         payload = {}
@@ -331,15 +579,10 @@ class NewsApiClient(object):
                 raise TypeError("page param should be an int")
 
         # Send Request
-        r = self.request_method.get(const.EVERYTHING_URL, auth=self.auth, timeout=30, params=payload)
-        
-        # Check Status of Request
-        if r.status_code != requests.codes.ok:
-            raise NewsAPIException(r.json())
+        return self._request(const.EVERYTHING_URL, payload, timeout, deadline)
 
-        return r.json()
-
-    def get_sources(self, category=None, language=None, country=None):  # noqa: C901
+    @profiled
+    def get_sources(self, category=None, language=None, country=None, timeout=None, deadline=None):  # noqa: C901
         """Call the `/sources` endpoint.
 
         Fetch the subset of news publishers that /top-headlines are available from.
@@ -356,9 +599,17 @@ class NewsApiClient(object):
             See :data:`newsapi.const.countries` for the set of allowed values.
         :type country: str or None
 
+        :param timeout: Overrides the client's ``timeout`` for this call.
+        :type timeout: float or tuple(float, float) or None
+
+        :param deadline: Bounds this call; see :class:`newsapi.deadline.Deadline`.
+        :type deadline: newsapi.deadline.Deadline or None
+
         :return: JSON response as nested Python dictionary.
         :rtype: dict
         :raises NewsAPIException: If the ``"status"`` value of the response is ``"error"`` rather than ``"ok"``.
+        :raises DeadlineExceeded: If ``deadline`` passes before the response arrives.
+        :raises CircuitOpenError: If the client has a ``circuit_breaker`` and the endpoint's breaker is open.
         """
 
         payload = {}
@@ -396,10 +647,4 @@ class NewsApiClient(object):
         # Send Request
         if payload.get("language") is None:
             payload["language"] = const.DEFAULT_LANGUAGES.get(country)
-        r = self.request_method.get(const.SOURCES_URL, auth=self.auth, timeout=30, params=payload)
-
-        # Check Status of Request
-        if r.status_code != requests.codes.ok:
-            raise NewsAPIException(r.json())
-
-        return r.json()
+        return self._request(const.SOURCES_URL, payload, timeout, deadline)
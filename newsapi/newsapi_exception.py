@@ -1,8 +1,16 @@
 class NewsAPIException(Exception):
-    """Represents an ``error`` response status value from News API."""
+    """Represents an ``error`` response status value from News API.
 
-    def __init__(self, exception):
+    :param exception: The decoded error response.
+    :type exception: dict
+
+    :param status_code: The HTTP status code of the response, if known.
+    :type status_code: int or None
+    """
+
+    def __init__(self, exception, status_code=None):
         self.exception = exception
+        self.status_code = status_code
 
     def get_exception(self):
         return self.exception
@@ -18,3 +26,34 @@ class NewsAPIException(Exception):
     def get_message(self):
         if self.exception["message"]:
             return self.exception["message"]
+
+
+class DeadlineExceeded(NewsAPIException):
+    """Raised when a :class:`newsapi.deadline.Deadline` passes before a call could complete.
+
+    :param timed_out: ``True`` if the call was sent and the server did not answer before the deadline, as
+        opposed to the deadline passing before the call was sent.
+    :type timed_out: bool
+    """
+
+    def __init__(self, message="deadline exceeded", timed_out=False):
+        super(DeadlineExceeded, self).__init__({"status": "error", "code": "deadlineExceeded", "message": message})
+        self.timed_out = timed_out
+
+
+class CircuitOpenError(NewsAPIException):
+    """Raised without calling the API while the circuit breaker for an endpoint is open.
+
+    :param retry_after: Seconds until the breaker lets a probe call through.
+    :type retry_after: float
+    """
+
+    def __init__(self, retry_after):
+        super(CircuitOpenError, self).__init__(
+            {
+                "status": "error",
+                "code": "circuitOpen",
+                "message": "circuit breaker is open; retry in %.1f seconds" % retry_after,
+            }
+        )
+        self.retry_after = retry_after
@@ -0,0 +1,36 @@
+"""Helpers for walking paged News API responses."""
+from __future__ import unicode_literals
+
+__all__ = ("iter_pages",)
+
+#: The largest ``page_size`` accepted by the API.
+MAX_PAGE_SIZE = 100
+
+
+def iter_pages(fetch, page_size=MAX_PAGE_SIZE, start_page=1, max_pages=None, deadline=None, **params):
+    """Call ``fetch`` once per page and yield ``(page, response)`` tuples.
+
+    Iteration stops once ``totalResults`` articles have been seen, a page comes back empty,
+    or ``max_pages`` (the last page number to request) has been reached.
+
+    :param fetch: A paged client method, such as :meth:`NewsApiClient.get_everything`.
+    :param page_size: The number of articles to request per page.
+    :param start_page: The first page to request; used to resume an interrupted walk.
+    :param max_pages: The last page number to request, or ``None`` for no limit.
+    :param deadline: A :class:`newsapi.deadline.Deadline` for the whole walk.  It is passed on to every call,
+        and :class:`DeadlineExceeded` is raised if it passes between pages.
+    :param params: Further keyword arguments passed to ``fetch`` on every call.
+    """
+    if deadline is not None:
+        params["deadline"] = deadline
+    page = start_page
+    while max_pages is None or page <= max_pages:
+        if deadline is not None:
+            deadline.check()
+        response = fetch(page=page, page_size=page_size, **params)
+        yield page, response
+
+        articles = response.get("articles") or []
+        if not articles or page * page_size >= response.get("totalResults", 0):
+            return
+        page += 1
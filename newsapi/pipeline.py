@@ -0,0 +1,246 @@
+"""Deliver fetched articles to several sinks in the background, overlapping delivery with fetching.
+
+Each sink gets a bounded queue and a worker thread that writes articles in batches, flushed when
+``batch_size`` articles are waiting or ``flush_interval`` seconds after the first of them arrived.
+When a sink falls behind and its queue fills up, :meth:`Pipeline.put` blocks, which slows fetching down
+to the pace of the slowest sink::
+
+    with Pipeline([NDJSONSink("articles.ndjson"), MemorySink()], batch_size=500) as pipeline:
+        pipeline.feed(iter_pages(api.get_everything, q="bitcoin"))
+"""
+from __future__ import unicode_literals
+
+import io
+import json
+import threading
+import time
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+__all__ = ("FileSink", "MemorySink", "NDJSONSink", "Pipeline", "Sink")
+
+_STOP = object()
+
+
+class Sink(object):
+    """Somewhere articles are delivered to.  Subclasses implement :meth:`write_batch`.
+
+    Each sink is only called from its own worker thread.
+    """
+
+    def write_batch(self, articles):
+        """Deliver a list of articles.  An exception stops the pipeline and is raised to its producer."""
+        raise NotImplementedError
+
+    def close(self):
+        """Release resources once the last batch has been written."""
+
+
+class MemorySink(Sink):
+    """Keeps every batch in memory; useful in tests.
+
+    :param delay: Seconds to sleep per batch, to simulate a slow sink.
+    :type delay: float
+    """
+
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.batches = []
+        self.closed = False
+
+    @property
+    def articles(self):
+        return [article for batch in self.batches for article in batch]
+
+    def write_batch(self, articles):
+        time.sleep(self.delay)
+        self.batches.append(list(articles))
+
+    def close(self):
+        self.closed = True
+
+
+class FileSink(Sink):
+    """Appends one line per article to a file, flushing after each batch.
+
+    :param path: The file to append to.
+    :type path: str
+    :param serialize: Turns an article dict into a line of text, without the newline.
+    :type serialize: callable
+    """
+
+    def __init__(self, path, serialize):
+        self.path = path
+        self.serialize = serialize
+        self._file = io.open(path, "ab")
+
+    def write_batch(self, articles):
+        self._file.write(b"".join(self.serialize(article).encode("utf-8") + b"\n" for article in articles))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+class NDJSONSink(FileSink):
+    """Appends articles to a file as newline-delimited JSON, in the format written by :mod:`newsapi.crawl`."""
+
+    def __init__(self, path):
+        super(NDJSONSink, self).__init__(path, lambda article: json.dumps(article, sort_keys=True))
+
+
+class _Stage(object):
+    """A sink, its queue and its delivery counters."""
+
+    def __init__(self, sink, max_queued):
+        self.sink = sink
+        # Unbounded: the pipeline reserves room in every stage before it queues an article on any of them.
+        self.queue = queue.Queue()
+        self.room = max_queued
+        self.written = 0
+        self.batches = 0
+        self.error = None
+        self.thread = None
+
+
+class Pipeline(object):
+    """Fans articles out to ``sinks``, each fed by its own bounded queue and worker thread.
+
+    :param sinks: The :class:`Sink` instances to deliver every article to.
+    :type sinks: list
+    :param batch_size: The largest batch passed to :meth:`Sink.write_batch`.
+    :type batch_size: int
+    :param flush_interval: Seconds an article may wait for its batch to fill before it is written anyway.
+    :type flush_interval: float
+    :param max_queued: The number of articles a sink may fall behind by before :meth:`put` blocks.
+    :type max_queued: int
+    """
+
+    def __init__(self, sinks, batch_size=100, flush_interval=1.0, max_queued=1000):
+        if not sinks:
+            raise ValueError("sinks should not be empty")
+        if batch_size < 1 or max_queued < 1:
+            raise ValueError("batch_size and max_queued should be positive")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._stages = [_Stage(sink, max_queued) for sink in sinks]
+        self._room_changed = threading.Condition()
+        self._closed = False
+        for stage in self._stages:
+            stage.thread = threading.Thread(target=self._run, args=(stage,))
+            stage.thread.daemon = True
+            stage.thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def put(self, article, timeout=None):
+        """Queue ``article`` for every sink, blocking while a sink's queue is full.
+
+        The article is queued for all sinks or, if ``timeout`` passes, for none of them, so a failed call can
+        be retried without delivering duplicates.
+
+        :param timeout: Seconds to wait for room in every queue, or ``None`` to wait as long as it takes.
+        :raises queue.Full: If ``timeout`` passes first.
+        """
+        self._raise_error()
+        if self._closed:
+            raise ValueError("pipeline is closed")
+        give_up_at = None if timeout is None else time.time() + timeout
+        with self._room_changed:
+            while any(stage.room == 0 for stage in self._stages):
+                if give_up_at is None:
+                    self._room_changed.wait()
+                    continue
+                remaining = give_up_at - time.time()
+                if remaining <= 0:
+                    raise queue.Full
+                self._room_changed.wait(remaining)
+            for stage in self._stages:
+                stage.room -= 1
+        for stage in self._stages:
+            stage.queue.put(article)
+
+    def feed(self, pages):
+        """Queue the articles of every response from ``pages``, as yielded by :func:`newsapi.pagination.iter_pages`.
+
+        :return: The number of articles queued.
+        :rtype: int
+        """
+        count = 0
+        for _, response in pages:
+            for article in response.get("articles") or []:
+                self.put(article)
+                count += 1
+        return count
+
+    def stats(self):
+        """Return, for each sink in order, the articles queued and written, and the batches written.
+
+        :rtype: list
+        """
+        return [
+            {"queued": stage.queue.qsize(), "written": stage.written, "batches": stage.batches}
+            for stage in self._stages
+        ]
+
+    def close(self):
+        """Write out everything queued, stop the workers and close the sinks.
+
+        :raises Exception: The first error raised by a sink, if any.
+        """
+        if not self._closed:
+            self._closed = True
+            for stage in self._stages:
+                stage.queue.put(_STOP)
+            for stage in self._stages:
+                stage.thread.join()
+                stage.sink.close()
+        self._raise_error()
+
+    def _raise_error(self):
+        for stage in self._stages:
+            if stage.error is not None:
+                raise stage.error
+
+    def _run(self, stage):
+        batch = []
+        flush_at = None
+        while True:
+            timeout = None if not batch else max(0, flush_at - time.time())
+            try:
+                article = stage.queue.get(timeout=timeout)
+            except queue.Empty:
+                article = None
+
+            if article is not _STOP and article is not None:
+                with self._room_changed:
+                    stage.room += 1
+                    self._room_changed.notify_all()
+                batch.append(article)
+                if len(batch) == 1:
+                    flush_at = time.time() + self.flush_interval
+            if batch and (article is _STOP or len(batch) >= self.batch_size or time.time() >= flush_at):
+                self._write(stage, batch)
+                batch = []
+            if article is _STOP:
+                return
+
+    @staticmethod
+    def _write(stage, batch):
+        # After a failure, batches are dropped so producers are not left blocked on a full queue.
+        if stage.error is not None:
+            return
+        try:
+            stage.sink.write_batch(batch)
+        except Exception as e:
+            stage.error = e
+            return
+        stage.written += len(batch)
+        stage.batches += 1
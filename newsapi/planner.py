@@ -0,0 +1,200 @@
+"""Merge overlapping `/everything` queries into fewer upstream calls.
+
+Queries that differ only in their ``sources``, their ``domains`` or their date window are compatible.
+:func:`plan_queries` merges compatible queries whose date windows overlap, up to the API's limits on
+``sources`` and ``domains``, and :func:`run_queries` runs the merged queries and hands each original query
+the articles that match it::
+
+    specs = {
+        "tenant-a": {"q": "bitcoin", "sources": "bbc-news", "from_param": "2024-03-01", "to": "2024-03-02"},
+        "tenant-b": {"q": "bitcoin", "sources": "cnn", "from_param": "2024-03-02", "to": "2024-03-03"},
+    }
+    results, report = run_queries(api, specs)
+    print(report["queries_merged"], report["calls"], len(results["tenant-a"]))
+"""
+from __future__ import unicode_literals
+
+import collections
+
+from newsapi.pagination import MAX_PAGE_SIZE, iter_pages
+from newsapi.utils import DATE_LEN, DATETIME_LEN, is_valid_string, stringify_date_param
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:  # Python 2
+    from urlparse import urlsplit
+
+__all__ = ("MAX_DOMAINS", "MAX_SOURCES", "MergedQuery", "plan_queries", "run_queries")
+
+#: The most ``sources`` accepted in one request.
+MAX_SOURCES = 20
+#: The most ``domains`` put in one merged request, to keep URLs and result sets manageable.
+MAX_DOMAINS = 20
+
+# Stand-ins for a missing bound, ordered before and after every ISO-8601 timestamp.
+_NO_START = ""
+_NO_END = "~"
+
+#: One upstream query: keyword arguments for :meth:`NewsApiClient.get_everything`, and the IDs of the
+#: original queries it answers.
+MergedQuery = collections.namedtuple("MergedQuery", ("params", "members"))
+
+
+def _split(value):
+    if value is None:
+        return frozenset()
+    if is_valid_string(value):
+        value = value.split(",")
+    return frozenset(item.strip() for item in value if item.strip())
+
+
+def _window(spec):
+    """Return the spec's date window as a pair of comparable ``YYYY-MM-DDTHH:MM:SS`` strings."""
+    start, end = _NO_START, _NO_END
+    if spec.get("from_param") is not None:
+        start = stringify_date_param(spec["from_param"])
+        if len(start) == DATE_LEN:
+            start += "T00:00:00"
+    if spec.get("to") is not None:
+        end = stringify_date_param(spec["to"])
+        if len(end) == DATE_LEN:
+            end += "T23:59:59"
+    return start, end
+
+
+class _Query(object):
+    """A spec with its filters parsed, or a bucket of merged specs."""
+
+    def __init__(self, spec_id, spec):
+        self.members = [spec_id]
+        self.sources = _split(spec.get("sources"))
+        self.domains = _split(spec.get("domains"))
+        self.start, self.end = _window(spec)
+
+    def absorb(self, other, max_sources, max_domains):
+        """Merge ``other`` into this query if their windows overlap and the merged filters fit the limits."""
+        if other.start > self.end or other.end < self.start:
+            return False
+        sources, domains = self.sources | other.sources, self.domains | other.domains
+        if len(sources) > max_sources or len(domains) > max_domains:
+            return False
+        self.members.extend(other.members)
+        self.sources, self.domains = sources, domains
+        self.start, self.end = min(self.start, other.start), max(self.end, other.end)
+        return True
+
+    def params(self, spec):
+        """Return ``spec`` with its sources, domains and window replaced by this query's."""
+        widened = ("sources", "domains", "from_param", "to")
+        params = dict((name, value) for name, value in spec.items() if name not in widened)
+        if self.sources:
+            params["sources"] = ",".join(sorted(self.sources))
+        if self.domains:
+            params["domains"] = ",".join(sorted(self.domains))
+        if self.start != _NO_START:
+            params["from_param"] = self.start
+        if self.end != _NO_END:
+            params["to"] = self.end
+        return params
+
+    def matches(self, article):
+        if self.sources and ((article.get("source") or {}).get("id") not in self.sources):
+            return False
+        if self.domains:
+            host = (urlsplit(article.get("url") or "").hostname or "").lower()
+            if not any(host == domain or host.endswith("." + domain) for domain in self.domains):
+                return False
+        published = (article.get("publishedAt") or "")[:DATETIME_LEN]
+        if published and not self.start <= published <= self.end:
+            return False
+        return True
+
+
+def _compatibility_key(spec):
+    """Specs with equal keys differ only in what merging can widen: sources, domains and dates."""
+    if "page" in spec or "page_size" in spec:
+        raise ValueError("query specs should not set page or page_size; the planner pages merged queries itself")
+    fixed = dict(spec)
+    for name in ("from_param", "to"):
+        fixed.pop(name, None)
+    sources, domains = _split(fixed.pop("sources", None)), _split(fixed.pop("domains", None))
+    if sources and domains:
+        # How the API combines both filters is not documented, so such specs only merge on dates.
+        fixed["sources"], fixed["domains"] = sorted(sources), sorted(domains)
+    fixed["_filter"] = "sources" if sources else "domains" if domains else None
+    return tuple(sorted((name, repr(value)) for name, value in fixed.items() if value is not None))
+
+
+def plan_queries(specs, max_sources=MAX_SOURCES, max_domains=MAX_DOMAINS):
+    """Merge compatible query specs into as few queries as the limits allow.
+
+    Specs are compatible if all their parameters other than ``sources``, ``domains``, ``from_param`` and ``to``
+    are equal, and they filter on the same one of ``sources`` or ``domains`` (or neither).  Compatible specs
+    whose date windows overlap are merged: their sources or domains are unioned, up to ``max_sources`` or
+    ``max_domains``, and their windows widened to cover both.
+
+    :param specs: Keyword arguments for :meth:`NewsApiClient.get_everything` by query ID, without paging.
+    :type specs: dict
+    :param max_sources: The most sources in one merged query.
+    :type max_sources: int
+    :param max_domains: The most domains in one merged query.
+    :type max_domains: int
+    :rtype: list(MergedQuery)
+    """
+    groups = collections.OrderedDict()
+    for spec_id in sorted(specs, key=lambda spec_id: _window(specs[spec_id])):
+        groups.setdefault(_compatibility_key(specs[spec_id]), []).append(spec_id)
+
+    plan = []
+    for spec_ids in groups.values():
+        merged = []
+        for spec_id in spec_ids:
+            query = _Query(spec_id, specs[spec_id])
+            if not any(bucket.absorb(query, max_sources, max_domains) for bucket in merged):
+                merged.append(query)
+        plan.extend(MergedQuery(bucket.params(specs[bucket.members[0]]), tuple(bucket.members)) for bucket in merged)
+    return plan
+
+
+def run_queries(client, specs, page_size=MAX_PAGE_SIZE, max_pages=None, **plan_options):
+    """Plan ``specs`` with :func:`plan_queries`, run the merged queries and split their articles by query.
+
+    Every page of each merged query is fetched, up to ``max_pages`` per original query it answers, and each
+    article is handed to every original query whose sources or domains and date window it matches.  A member
+    of a merged query is not guaranteed exactly the articles it would get alone with ``max_pages``: the pages
+    are shared, so a member with many matching articles can use more than its share.
+
+    :param client: A :class:`NewsApiClient`.
+    :param specs: Keyword arguments for :meth:`NewsApiClient.get_everything` by query ID, without paging.
+    :type specs: dict
+    :param page_size: The page size of the merged queries.
+    :param max_pages: The number of pages to fetch per original query, or ``None`` for all of them.  A merged
+        query of three original queries fetches up to ``3 * max_pages`` pages.
+    :param plan_options: ``max_sources`` and ``max_domains`` for :func:`plan_queries`.
+    :return: The articles of each query by ID, and a report with the number of original ``queries``, of
+        ``upstream_queries`` run for them, of ``queries_merged`` (the difference), and the API ``calls`` made.
+        Since merged queries can need more pages, compare ``calls`` with a run of the original queries to
+        measure the calls saved.
+    :rtype: tuple(dict, dict)
+    """
+    plan = plan_queries(specs, **plan_options)
+    filters = dict((spec_id, _Query(spec_id, spec)) for spec_id, spec in specs.items())
+    results = dict((spec_id, []) for spec_id in specs)
+    calls = 0
+    for merged in plan:
+        members = [filters[spec_id] for spec_id in merged.members]
+        limit = None if max_pages is None else max_pages * len(members)
+        for _, response in iter_pages(client.get_everything, page_size=page_size, max_pages=limit, **merged.params):
+            calls += 1
+            for article in response.get("articles") or []:
+                for query in members:
+                    if query.matches(article):
+                        results[query.members[0]].append(article)
+
+    report = {
+        "queries": len(specs),
+        "upstream_queries": len(plan),
+        "queries_merged": len(specs) - len(plan),
+        "calls": calls,
+    }
+    return results, report
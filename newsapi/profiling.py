@@ -0,0 +1,203 @@
+"""Opt-in profiling of where :class:`NewsApiClient` calls spend their time and memory.
+
+Pass a :class:`Profiler` to the client and every call is split into stages: ``validate`` (checking
+parameters and building the query), ``transport`` (``requests``, including ``auth``, which adds the
+headers) and ``decode`` (parsing the JSON body).  Time in the call outside these stages, such as cache
+lookups, is attributed to the call itself.  Background cache refreshes are recorded under a ``refresh``
+stage of their own::
+
+    profiler = Profiler(trace_allocations=True)
+    api = NewsApiClient(api_key=key, profiler=profiler)
+    ...
+    print(profiler.report())
+    with open("client.folded", "w") as f:
+        profiler.dump_collapsed(f, metric="cpu")
+
+The collapsed-stack output can be rendered with ``flamegraph.pl`` or loaded into speedscope.
+"""
+from __future__ import unicode_literals
+
+import contextlib
+import functools
+import threading
+import time
+
+__all__ = ("METRICS", "Profiler", "profiled")
+
+#: What is recorded per stage: wall-clock seconds, CPU seconds of the calling thread, and net bytes allocated.
+METRICS = ("wall", "cpu", "alloc_bytes")
+
+_wall_clock = getattr(time, "perf_counter", time.time)
+# thread_time only counts the calling thread, which keeps stages apart in a shared client.
+_cpu_clock = getattr(time, "thread_time", None) or getattr(time, "process_time", None) or time.clock
+
+
+class _Frame(object):
+    __slots__ = ("path", "wall", "cpu", "memory")
+
+
+class Profiler(object):
+    """Aggregates wall time, CPU time and, optionally, allocations per stage of client calls.
+
+    Stages nest: each is identified by its path from the outermost stage, like a stack in a profile.
+    A profiler can be shared by several clients and threads.
+
+    :param trace_allocations: Also record the net bytes allocated in each stage with :mod:`tracemalloc`,
+        which is started if it is not already running.  This slows calls down noticeably, and needs Python 3.4
+        or later.
+    :type trace_allocations: bool
+    """
+
+    def __init__(self, trace_allocations=False):
+        self._tracemalloc = None
+        if trace_allocations:
+            try:
+                import tracemalloc
+            except ImportError:  # Python 2
+                raise ValueError("trace_allocations needs tracemalloc, which was added in Python 3.4")
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            self._tracemalloc = tracemalloc
+        self._local = threading.local()
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _memory(self):
+        return self._tracemalloc.get_traced_memory()[0] if self._tracemalloc is not None else 0
+
+    def begin(self, name):
+        """Enter stage ``name`` inside the current one.  Prefer :meth:`stage` unless the end is elsewhere."""
+        stack = self._stack()
+        frame = _Frame()
+        frame.path = stack[-1].path + (name,) if stack else (name,)
+        frame.memory = self._memory()
+        frame.cpu = _cpu_clock()
+        frame.wall = _wall_clock()
+        stack.append(frame)
+
+    def end(self, name):
+        """Leave stage ``name``, and any stages still open inside it.  Does nothing if it is not open."""
+        stack = self._stack()
+        if not any(frame.path[-1] == name for frame in stack):
+            return
+        wall, cpu, memory = _wall_clock(), _cpu_clock(), self._memory()
+        while True:
+            frame = stack.pop()
+            self._add(frame.path, wall - frame.wall, cpu - frame.cpu, memory - frame.memory)
+            if frame.path[-1] == name:
+                return
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        """A context manager that records the enclosed code as stage ``name``."""
+        self.begin(name)
+        try:
+            yield
+        finally:
+            self.end(name)
+
+    def wrap(self, name, func):
+        """Return ``func`` wrapped to run as stage ``name``."""
+
+        # Not functools.wraps: ``func`` may be a callable object, such as the auth hook, without a ``__name__``.
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    def _add(self, path, wall, cpu, alloc_bytes):
+        with self._lock:
+            totals = self._totals.get(path)
+            if totals is None:
+                totals = self._totals[path] = {"calls": 0, "wall": 0.0, "cpu": 0.0, "alloc_bytes": 0}
+            totals["calls"] += 1
+            totals["wall"] += wall
+            totals["cpu"] += cpu
+            totals["alloc_bytes"] += alloc_bytes
+
+    def reset(self):
+        with self._lock:
+            self._totals.clear()
+
+    def stats(self):
+        """Return the totals of each stage, keyed by its ``;``-joined path, such as ``get_everything;decode``.
+
+        Each value holds the number of times the stage ran and its summed ``wall``, ``cpu`` and ``alloc_bytes``,
+        including nested stages.
+
+        :rtype: dict
+        """
+        with self._lock:
+            return dict((";".join(path), dict(totals)) for path, totals in self._totals.items())
+
+    def _exclusive(self, metric):
+        """Return each stage's ``metric`` minus that of the stages nested directly in it."""
+        with self._lock:
+            values = dict((path, totals[metric]) for path, totals in self._totals.items())
+        exclusive = dict(values)
+        for path, value in values.items():
+            if len(path) > 1 and path[:-1] in exclusive:
+                exclusive[path[:-1]] -= value
+        return exclusive
+
+    def dump_collapsed(self, f, metric="wall"):
+        """Write the profile to the text file ``f`` in the collapsed-stack format used by flame graph tools.
+
+        Each line is a ``;``-joined stage path and the stage's own ``metric``, excluding nested stages: time in
+        microseconds, or bytes for ``alloc_bytes``.
+
+        :param metric: One of :data:`METRICS`.
+        :type metric: str
+        """
+        if metric not in METRICS:
+            raise ValueError("metric should be one of %s" % ", ".join(METRICS))
+        scale = 1 if metric == "alloc_bytes" else 1e6
+        for path, value in sorted(self._exclusive(metric).items()):
+            value = int(round(value * scale))
+            if value > 0:
+                f.write("%s %d\n" % (";".join(path), value))
+
+    def report(self):
+        """Return a table of each stage's call count and mean wall time, CPU time and allocations.
+
+        :rtype: str
+        """
+        lines = ["%-40s %8s %12s %12s %14s" % ("stage", "calls", "wall ms", "cpu ms", "alloc bytes")]
+        for name, totals in sorted(self.stats().items()):
+            calls = totals["calls"]
+            lines.append(
+                "%-40s %8d %12.3f %12.3f %14d"
+                % (
+                    name,
+                    calls,
+                    totals["wall"] * 1000 / calls,
+                    totals["cpu"] * 1000 / calls,
+                    totals["alloc_bytes"] // calls,
+                )
+            )
+        return "\n".join(lines)
+
+
+def profiled(method):
+    """Decorate a :class:`NewsApiClient` endpoint method to record a stage per call when the client has a profiler.
+
+    Parameter validation is recorded as the ``validate`` stage, which the client ends once the request is built.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self.profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        with profiler.stage(method.__name__):
+            profiler.begin("validate")
+            return method(self, *args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,158 @@
+"""A :class:`newsapi.cache.ResponseCache` backend shared between machines through Redis."""
+from __future__ import unicode_literals
+
+import bisect
+import hashlib
+import json
+import math
+import zlib
+
+from newsapi.cache import CacheBackend
+
+__all__ = ("HashRing", "RedisBackend")
+
+
+def _hash(value):
+    return int(hashlib.md5(value.encode("utf-8")).hexdigest()[:16], 16)
+
+
+def _client_name(client):
+    """Name a redis-py client after the server it connects to, as ``host:port/db`` or ``path/db``."""
+    try:
+        kwargs = client.connection_pool.connection_kwargs
+    except AttributeError:
+        raise ValueError("cannot tell which server %r connects to; pass names" % (client,))
+    if "path" in kwargs:
+        return "%s/%s" % (kwargs["path"], kwargs.get("db", 0))
+    return "%s:%s/%s" % (kwargs.get("host", "localhost"), kwargs.get("port", 6379), kwargs.get("db", 0))
+
+
+class HashRing(object):
+    """Consistent hashing of keys onto nodes.
+
+    Each node is placed on the ring ``replicas`` times, at points derived from its name, so keys spread evenly,
+    the order of ``nodes`` does not matter, and adding or removing a node only moves the keys that hashed to it.
+
+    :param nodes: The nodes to shard between.
+    :type nodes: list
+    :param replicas: The number of points per node on the ring.
+    :type replicas: int
+    :param names: A unique, stable name for each node, such as ``"host:port"``, which must be the same on every
+        machine that shares the ring.  Defaults to ``str(node)``.
+    :type names: list or None
+    """
+
+    def __init__(self, nodes, replicas=100, names=None):
+        if not nodes:
+            raise ValueError("nodes should not be empty")
+        self.nodes = list(nodes)
+        self.names = ["%s" % node for node in self.nodes] if names is None else list(names)
+        if len(self.names) != len(self.nodes):
+            raise ValueError("names should have one entry per node")
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("node names should be unique")
+        points = sorted(
+            (_hash("%s:%d" % (name, replica)), name, index)
+            for index, name in enumerate(self.names)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _, _ in points]
+        self._indexes = [index for _, _, index in points]
+
+    def index(self, key):
+        """Return the position in ``nodes`` of the node that owns ``key``."""
+        position = bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)
+        return self._indexes[position]
+
+    def node(self, key):
+        return self.nodes[self.index(key)]
+
+
+class RedisBackend(CacheBackend):
+    """Stores cached responses in one or more Redis servers, sharded by consistent hashing.
+
+    Clients are `redis-py <https://github.com/redis/redis-py>`_ ``Redis`` instances, or anything with the same
+    ``get``, ``set``, ``delete``, ``scan_iter`` and ``pipeline`` methods; this module does not import redis itself.
+    Entries are stored as zlib-compressed JSON and expire on the server once no cache policy can serve them.
+    :meth:`get_many` fetches all keys owned by one server in a single pipelined round trip.
+
+    With every machine pointing at the same servers, a query fetched by one is a cache hit for all of them.
+    :meth:`claim` lets only one machine refresh a stale response, or, with the cache's ``fill_wait``, fetch a
+    missing one.  ::
+
+        import redis
+
+        backend = RedisBackend([redis.Redis(host=host) for host in ("cache-1", "cache-2", "cache-3")])
+        cache = ResponseCache(ttl=300, stale_while_revalidate=600, backend=backend, fill_wait=2)
+
+    Keys are assigned to servers by their names, which default to the ``host:port/db`` each client connects
+    to, so machines that list the same servers in a different order still agree on which one holds a key.
+
+    :param clients: One client per server.
+    :type clients: list
+    :param prefix: Prepended to every Redis key, to share servers with other data.
+    :type prefix: str
+    :param compress_level: The zlib compression level, from 1 (fastest) to 9 (smallest).
+    :type compress_level: int
+    :param names: A stable name per client, for clients that don't expose their connection settings, or to
+        keep keys in place when a server moves to a new address.
+    :type names: list or None
+    """
+
+    def __init__(self, clients, prefix="newsapi:", compress_level=6, names=None):
+        if names is None:
+            names = [_client_name(client) for client in clients]
+        self.ring = HashRing(clients, names=names)
+        self.prefix = prefix
+        self.compress_level = compress_level
+
+    def _name(self, key):
+        return self.prefix + "r:" + key
+
+    def _dumps(self, entry):
+        data = json.dumps(list(entry), separators=(",", ":")).encode("utf-8")
+        return zlib.compress(data, self.compress_level)
+
+    @staticmethod
+    def _loads(payload):
+        if payload is None:
+            return None
+        try:
+            stored_at, response = json.loads(zlib.decompress(payload).decode("utf-8"))
+        except (zlib.error, ValueError):
+            # Unreadable, e.g. written by an incompatible version: treat as a miss.
+            return None
+        return stored_at, response
+
+    def get(self, key):
+        return self._loads(self.ring.node(key).get(self._name(key)))
+
+    def get_many(self, keys):
+        by_shard = {}
+        for position, key in enumerate(keys):
+            by_shard.setdefault(self.ring.index(key), []).append(position)
+
+        entries = [None] * len(keys)
+        for index, positions in by_shard.items():
+            pipe = self.ring.nodes[index].pipeline(transaction=False)
+            for position in positions:
+                pipe.get(self._name(keys[position]))
+            for position, payload in zip(positions, pipe.execute()):
+                entries[position] = self._loads(payload)
+        return entries
+
+    def set(self, key, entry, expires_in):
+        self.ring.node(key).set(self._name(key), self._dumps(entry), ex=max(1, int(math.ceil(expires_in))))
+
+    def delete(self, key):
+        self.ring.node(key).delete(self._name(key))
+
+    def clear(self):
+        for client in self.ring.nodes:
+            names = list(client.scan_iter(match=self.prefix + "*"))
+            if names:
+                client.delete(*names)
+
+    def claim(self, key, seconds):
+        name = self.prefix + "claim:" + key
+        return bool(self.ring.node(key).set(name, b"1", nx=True, ex=max(1, int(math.ceil(seconds)))))
@@ -0,0 +1,303 @@
+"""A priority scheduler that shares one client, and one API quota, between several classes of traffic.
+
+Interactive lookups and background crawls can be submitted to the same :class:`Scheduler`.  Higher
+priority classes are always dispatched first, each class can be capped in concurrency and in its
+share of the request quota, and queued jobs run earliest-deadline-first within their class::
+
+    api = NewsApiClient(api_key=key, shared=True)
+    classes = [
+        PriorityClass("interactive", priority=0),
+        PriorityClass("crawl", priority=1, max_concurrency=4, quota_share=0.7),
+    ]
+    scheduler = Scheduler(api, classes, max_concurrency=8, quota=(1000, 3600))
+    job = scheduler.submit("interactive", "get_top_headlines", deadline=2.0, country="us")
+    headlines = job.result()
+"""
+from __future__ import unicode_literals
+
+import collections
+import heapq
+import itertools
+import threading
+import time
+
+from newsapi.deadline import Deadline
+from newsapi.newsapi_exception import DeadlineExceeded, NewsAPIException
+from newsapi.utils import is_valid_num, is_valid_string
+
+__all__ = ("PriorityClass", "Job", "Scheduler")
+
+#: The number of recent queue waits kept per class for :meth:`Scheduler.metrics`.
+WAIT_SAMPLES = 1000
+
+
+def _error(code, message):
+    return NewsAPIException({"status": "error", "code": code, "message": message})
+
+
+class PriorityClass(object):
+    """A class of traffic.
+
+    :param name: The name used to submit jobs to this class.
+    :type name: str
+    :param priority: Lower numbers are dispatched first.
+    :type priority: int
+    :param max_concurrency: The most jobs of this class that may run at once, or ``None`` for no cap.
+    :type max_concurrency: int or None
+    :param quota_share: The fraction of the scheduler's quota this class may use per period, or ``None``
+        for no cap.  Shares act as ceilings, so a low-priority class capped at ``0.7`` always leaves
+        30% of the quota for everything else.
+    :type quota_share: float or None
+    """
+
+    def __init__(self, name, priority, max_concurrency=None, quota_share=None):
+        if quota_share is not None and not 0 < quota_share <= 1:
+            raise ValueError("quota_share should be between 0 and 1")
+        self.name = name
+        self.priority = priority
+        self.max_concurrency = max_concurrency
+        self.quota_share = quota_share
+
+
+class Job(object):
+    """A submitted call.  Wait for it with :meth:`result`."""
+
+    def __init__(self, priority_class, func, kwargs, deadline):
+        self.priority_class = priority_class
+        self.func = func
+        self.kwargs = kwargs
+        self.deadline = deadline
+        self.enqueued_at = time.time()
+        self.started_at = None
+        self._result = None
+        self._error = None
+        self._done = threading.Event()
+
+    @property
+    def queue_wait(self):
+        """Seconds spent queued, or ``None`` if the job has not started."""
+        return None if self.started_at is None else self.started_at - self.enqueued_at
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """Wait up to ``timeout`` seconds for the call and return its result, or raise its exception.
+
+        :raises DeadlineExceeded: If the job's deadline passed while it was queued.
+        :raises NewsAPIException: With code ``"preempted"`` if the job was removed from the queue to make room
+            for more urgent work.
+        """
+        if not self._done.wait(timeout):
+            raise _error("timeout", "job did not finish within %s seconds" % timeout)
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def _finish(self, result=None, error=None):
+        self._result = result
+        self._error = error
+        self._done.set()
+
+
+class _ClassState(object):
+    def __init__(self, priority_class):
+        self.priority_class = priority_class
+        self.queue = []
+        self.running = 0
+        self.dispatched = 0
+        self.completed = 0
+        self.dropped = 0
+        self.waits = collections.deque(maxlen=WAIT_SAMPLES)
+
+
+def _percentile(values, fraction):
+    if not values:
+        return None
+    values = sorted(values)
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+class Scheduler(object):
+    """Dispatch calls on ``client`` from a pool of ``max_concurrency`` threads, by priority class.
+
+    :param client: The client to call.  Use a shared client (``NewsApiClient(..., shared=True)``), since
+        calls run on several threads.
+    :param classes: The :class:`PriorityClass` objects that jobs can be submitted to.
+    :param max_concurrency: The number of calls in flight across all classes.
+    :param quota: ``(requests, period_seconds)``: the total number of calls allowed per period, or ``None``.
+    :param max_queued: The most jobs that may wait at once, or ``None`` for no bound.
+    """
+
+    def __init__(self, client, classes, max_concurrency=8, quota=None, max_queued=None):
+        self.client = client
+        self.quota = quota
+        self.max_queued = max_queued
+        self._classes = {}
+        for priority_class in classes:
+            self._classes[priority_class.name] = _ClassState(priority_class)
+        self._by_priority = sorted(self._classes.values(), key=lambda state: state.priority_class.priority)
+        self._sequence = itertools.count()
+        self._queued = 0
+        self._window_start = time.time()
+        self._window_used = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._threads = [threading.Thread(target=self._work) for _ in range(max_concurrency)]
+        for thread in self._threads:
+            thread.daemon = True
+            thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+    def submit(self, class_name, method, deadline=None, preempt=False, **kwargs):
+        """Queue a call and return its :class:`Job`.
+
+        :param class_name: The name of the :class:`PriorityClass` to run in.
+        :param method: The name of a client method, such as ``"get_everything"``, or a callable.
+        :param deadline: A :class:`newsapi.deadline.Deadline`, or seconds from now.  A job still queued when
+            it passes is dropped; otherwise, the deadline is passed on to the call.
+        :param preempt: If the queue is full, drop the newest queued job of a lower-priority class to make room.
+        :param kwargs: Keyword arguments for the call.
+        :raises NewsAPIException: With code ``"queueFull"`` if the queue is full and nothing could be preempted.
+        """
+        state = self._classes[class_name]
+        func = getattr(self.client, method) if is_valid_string(method) else method
+        if deadline is not None:
+            if is_valid_num(deadline):
+                deadline = Deadline(deadline)
+            kwargs["deadline"] = deadline
+        job = Job(state.priority_class, func, kwargs, deadline)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            if self.max_queued is not None and self._queued >= self.max_queued:
+                if not (preempt and self._preempt_one(state.priority_class.priority)):
+                    raise _error("queueFull", "scheduler queue is full")
+            sort_key = deadline.expires_at if deadline is not None else float("inf")
+            heapq.heappush(state.queue, (sort_key, next(self._sequence), job))
+            self._queued += 1
+            self._cond.notify()
+        return job
+
+    def cancel_queued(self, class_name):
+        """Drop every queued job of ``class_name``; they fail with code ``"preempted"``.
+
+        :return: The number of jobs dropped.
+        """
+        state = self._classes[class_name]
+        with self._cond:
+            jobs = [job for _, _, job in state.queue]
+            del state.queue[:]
+            self._queued -= len(jobs)
+            state.dropped += len(jobs)
+        for job in jobs:
+            job._finish(error=_error("preempted", "job was cancelled before it started"))
+        return len(jobs)
+
+    def metrics(self):
+        """Return per-class queue and latency figures: queued, running, completed and dropped counts, and the
+        p50, p99 and maximum queue wait, in seconds, over recent jobs.
+
+        :rtype: dict
+        """
+        with self._cond:
+            return {
+                name: {
+                    "queued": len(state.queue),
+                    "running": state.running,
+                    "completed": state.completed,
+                    "dropped": state.dropped,
+                    "wait_p50": _percentile(state.waits, 0.5),
+                    "wait_p99": _percentile(state.waits, 0.99),
+                    "wait_max": max(state.waits) if state.waits else None,
+                }
+                for name, state in self._classes.items()
+            }
+
+    def shutdown(self, wait=True, cancel_queued=False):
+        """Stop accepting jobs.
+
+        Already queued jobs still run, unless ``cancel_queued`` is set, in which case they fail with code
+        ``"preempted"``.  With ``wait``, block until the running and remaining queued jobs have finished.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if cancel_queued:
+            for name in self._classes:
+                self.cancel_queued(name)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _preempt_one(self, priority):
+        for state in reversed(self._by_priority):
+            if state.priority_class.priority <= priority:
+                return False
+            if state.queue:
+                newest = max(state.queue, key=lambda entry: entry[1])
+                state.queue.remove(newest)
+                heapq.heapify(state.queue)
+                self._queued -= 1
+                state.dropped += 1
+                newest[2]._finish(error=_error("preempted", "job was preempted by higher-priority work"))
+                return True
+        return False
+
+    def _quota_left(self, state, now):
+        if self.quota is None:
+            return True
+        requests, period = self.quota
+        if now - self._window_start >= period:
+            self._window_start, self._window_used = now, 0
+            for other in self._classes.values():
+                other.dispatched = 0
+        if self._window_used >= requests:
+            return False
+        share = state.priority_class.quota_share
+        return share is None or state.dispatched < share * requests
+
+    def _next_job(self, now):
+        """Pop the next job to run, failing any whose deadline has passed.  Called with the lock held."""
+        for state in self._by_priority:
+            cap = state.priority_class.max_concurrency
+            while state.queue and (cap is None or state.running < cap) and self._quota_left(state, now):
+                _, _, job = heapq.heappop(state.queue)
+                self._queued -= 1
+                if job.deadline is not None and job.deadline.expired():
+                    state.dropped += 1
+                    job._finish(error=DeadlineExceeded("job deadline passed while it was queued"))
+                    continue
+                state.running += 1
+                state.dispatched += 1
+                self._window_used += 1
+                job.started_at = now
+                state.waits.append(job.queue_wait)
+                return state, job
+        return None, None
+
+    def _work(self):
+        while True:
+            with self._cond:
+                state, job = self._next_job(time.time())
+                while job is None:
+                    if self._closed and not self._queued:
+                        return
+                    # Re-check periodically: quota windows roll over and deadlines expire without a notify.
+                    self._cond.wait(0.05)
+                    state, job = self._next_job(time.time())
+
+            try:
+                job._finish(result=job.func(**job.kwargs))
+            except Exception as e:
+                job._finish(error=e)
+
+            with self._cond:
+                state.running -= 1
+                state.completed += 1
+                self._cond.notify_all()
@@ -0,0 +1,83 @@
+"""Content negotiation and transfer accounting for News API responses."""
+from __future__ import unicode_literals
+
+import collections
+
+__all__ = ("TransferStats", "accept_encoding", "transfer_stats", "article_projection")
+
+_accept_encoding = None
+
+
+def accept_encoding():
+    """Return the ``Accept-Encoding`` value to send: gzip and deflate, plus br when a Brotli decoder is installed.
+
+    ``requests`` can only decode Brotli bodies if ``brotli`` or ``brotlicffi`` is importable, so br is not
+    offered otherwise.
+    """
+    global _accept_encoding
+    if _accept_encoding is None:
+        encodings = ["gzip", "deflate"]
+        for module in ("brotli", "brotlicffi"):
+            try:
+                __import__(module)
+            except ImportError:
+                continue
+            encodings.append("br")
+            break
+        _accept_encoding = ", ".join(encodings)
+    return _accept_encoding
+
+
+_TransferStats = collections.namedtuple("TransferStats", ("url", "content_encoding", "wire_bytes", "decoded_bytes"))
+
+
+class TransferStats(_TransferStats):
+    """Sizes of one response body: as transferred over the wire, and after content decoding."""
+
+    __slots__ = ()
+
+    @property
+    def ratio(self):
+        """``decoded_bytes / wire_bytes``, or ``1.0`` for an empty body."""
+        return float(self.decoded_bytes) / self.wire_bytes if self.wire_bytes else 1.0
+
+
+def transfer_stats(response):
+    """Build :class:`TransferStats` for a response whose body has already been read.
+
+    The wire size comes from the underlying ``urllib3`` response, which counts the raw bytes it read.
+    Responses without one (such as replayed responses) fall back to ``Content-Length``, then to the
+    decoded size.
+    """
+    decoded_bytes = len(response.content)
+    content_encoding = response.headers.get("Content-Encoding", "identity")
+
+    wire_bytes = None
+    tell = getattr(getattr(response, "raw", None), "tell", None)
+    if tell is not None:
+        try:
+            wire_bytes = tell()
+        except (IOError, OSError, ValueError):
+            pass
+    if not wire_bytes and response.headers.get("Content-Length", "").isdigit():
+        wire_bytes = int(response.headers["Content-Length"])
+    if not wire_bytes:
+        wire_bytes = decoded_bytes
+
+    return TransferStats(response.url, content_encoding, wire_bytes, decoded_bytes)
+
+
+def article_projection(fields):
+    """Return a JSON ``object_hook`` that keeps only ``fields`` of each article.
+
+    Articles are recognised by their ``url`` and ``publishedAt`` keys.  Each one is trimmed as soon as
+    it is decoded, so the dropped values are released straight away instead of living on in the response.
+    """
+    fields = frozenset(fields)
+
+    def hook(obj):
+        if "publishedAt" in obj and "url" in obj:
+            return {key: value for key, value in obj.items() if key in fields}
+        return obj
+
+    return hook
@@ -0,0 +1,194 @@
+"""Record and replay News API traffic for offline testing.
+
+:class:`RecordingTransport` wraps a real session and appends every request/response pair to a
+gzip-compressed cassette file, one compact JSON object per line, together with when the request was
+sent.  :class:`ReplayTransport` serves those responses back without touching the network, either as fast
+as possible or with the latency, and optionally the gaps between requests, that were originally observed.
+Both are passed to :class:`NewsApiClient` in place of a session::
+
+    with RecordingTransport("traffic.jsonl.gz", session=requests.Session()) as recorder:
+        api = NewsApiClient(api_key=key, session=recorder)
+        ...
+
+    api = NewsApiClient(api_key=key, session=ReplayTransport("traffic.jsonl.gz"))
+
+Request headers are never written, so cassettes don't contain your API key.
+"""
+from __future__ import unicode_literals
+
+import collections
+import datetime
+import gzip
+import json
+import threading
+import time
+import zlib
+
+__all__ = ("RecordingTransport", "ReplayTransport", "CassetteResponse")
+
+
+def _request_key(url, params):
+    """Build a lookup key that is independent of parameter order, mirroring how requests encodes params."""
+    items = []
+    for name, value in (params or {}).items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple)):
+            value = [str(v) for v in value]
+        else:
+            value = str(value)
+        items.append([name, value])
+    return json.dumps([url, sorted(items)], sort_keys=True)
+
+
+# The body is stored decoded, so headers describing the wire encoding no longer apply.
+_WIRE_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def _recorded_headers(headers):
+    return {name: value for name, value in headers.items() if name.lower() not in _WIRE_HEADERS}
+
+
+def _read_lines(path):
+    """Return the lines of the cassette at ``path``, one gzip member per recording.
+
+    The last recording may still be open, or may never have been closed, in which case its member has no
+    trailer; every line flushed so far is returned, which :mod:`gzip` does not do on all Python versions.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    chunks = []
+    while data:
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        chunks.append(decompressor.decompress(data))
+        data = decompressor.unused_data
+    # Anything after the last newline is a line cut short while it was being written.
+    return b"".join(chunks).split(b"\n")[:-1]
+
+
+class CassetteResponse(object):
+    """A recorded response, exposing the subset of :class:`requests.Response` that the client uses."""
+
+    def __init__(self, url, status_code, headers, body, elapsed):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.text = body
+        self.content = body.encode("utf-8")
+        self.elapsed = datetime.timedelta(seconds=elapsed)
+
+    def json(self, **kwargs):
+        return json.loads(self.text, **kwargs)
+
+
+class RecordingTransport(object):
+    """Forward requests to ``session`` and append each exchange to the cassette at ``path``.
+
+    A recording is written as one gzip stream, so compression spans responses, and is flushed after every
+    exchange, so the cassette stays readable if the process dies before :meth:`close`.  Each exchange records
+    when its request was sent, in seconds since the transport was created.
+
+    :param path: The cassette file to append to.  It is created if it does not exist.
+    :type path: str
+
+    :param session: The session that performs the real requests.  Defaults to the ``requests`` module.
+    :type session: requests.Session or None
+    """
+
+    def __init__(self, path, session=None):
+        if session is None:
+            import requests as session
+        self.session = session
+        self.path = path
+        self._lock = threading.Lock()
+        self._origin = time.time()
+        self._file = gzip.open(path, "ab")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Finish the gzip stream.  The session is not closed."""
+        with self._lock:
+            self._file.close()
+
+    def get(self, url, params=None, **kwargs):
+        start = time.time()
+        response = self.session.get(url, params=params, **kwargs)
+        elapsed = time.time() - start
+
+        entry = {
+            "url": url,
+            "key": _request_key(url, params),
+            "started": round(start - self._origin, 6),
+            "elapsed": round(elapsed, 6),
+            "status": response.status_code,
+            "headers": _recorded_headers(response.headers),
+            "body": response.text,
+        }
+        line = json.dumps(entry, separators=(",", ":"), sort_keys=True) + "\n"
+        with self._lock:
+            self._file.write(line.encode("utf-8"))
+            # A sync flush ends on a byte boundary after a whole line, without closing the stream.
+            self._file.flush()
+        return response
+
+
+class ReplayTransport(object):
+    """Serve responses from the cassette at ``path`` without network access.
+
+    Requests are matched on URL and parameters.  Identical requests get the recorded responses in
+    recording order; once those run out, they start over from the first one.
+
+    :param path: A cassette written by :class:`RecordingTransport`.
+    :type path: str
+
+    :param speed: ``None`` to reply immediately, or a factor applied to the recorded latency
+        (``1.0`` reproduces the original timing, ``2.0`` replays twice as fast).
+    :type speed: float or None
+
+    :param pace: Also hold each request back until as long after the first replayed request as it was sent
+        after the first recorded one, divided by ``speed``, so that bursts and idle periods are reproduced.
+        Requests made later than that are not held back.
+    :type pace: bool
+    """
+
+    def __init__(self, path, speed=None, pace=False):
+        if speed is not None and speed <= 0:
+            raise ValueError("speed should be a positive number or None")
+        self.speed = speed
+        self.pace = pace
+        self._origin = None
+        self._entries = collections.defaultdict(list)
+        self._cursors = collections.defaultdict(int)
+        self._lock = threading.Lock()
+        for line in _read_lines(path):
+            entry = json.loads(line.decode("utf-8"))
+            self._entries[entry["key"]].append(entry)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self._entries.values())
+
+    def get(self, url, params=None, **kwargs):
+        key = _request_key(url, params)
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                raise LookupError("no recorded response for %s with params %r" % (url, params))
+            entry = entries[self._cursors[key] % len(entries)]
+            self._cursors[key] += 1
+            if self.pace:
+                # Cassettes recorded before start times were stored replay without gaps.
+                offset = entry.get("started", 0.0) / (self.speed or 1.0)
+                if self._origin is None:
+                    self._origin = time.time() - offset
+                wait = self._origin + offset - time.time()
+
+        if self.pace and wait > 0:
+            time.sleep(wait)
+        if self.speed is not None:
+            time.sleep(entry["elapsed"] / self.speed)
+        return CassetteResponse(entry["url"], entry["status"], entry["headers"], entry["body"], entry["elapsed"])
@@ -49,6 +49,19 @@ def validate_datetime_str(datetimestr):
         raise ValueError("Datetime input should be in format of YYYY-MM-DDTHH:MM:SS")
 
 
+def validate_timeout(timeout):
+    if isinstance(timeout, tuple):
+        if len(timeout) != 2 or not all(is_valid_num(t) for t in timeout):
+            raise TypeError("timeout param should be a number or a (connect, read) tuple of numbers")
+        values = timeout
+    elif is_valid_num(timeout):
+        values = (timeout,)
+    else:
+        raise TypeError("timeout param should be a number or a (connect, read) tuple of numbers")
+    if not all(t > 0 for t in values):
+        raise ValueError("timeout param should be greater than 0")
+
+
 PY2 = sys.version_info[0] == 2
 PY3 = sys.version_info[0] == 3
 
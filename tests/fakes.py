@@ -0,0 +1,67 @@
+"""In-process stand-ins for a ``requests`` session, for tests that don't need the real HTTP of ``stub_server``."""
+import json
+import threading
+import time
+
+OK = {"status": "ok", "totalResults": 0, "articles": []}
+
+
+def error_body(message="failed", code="unexpectedError"):
+    return {"status": "error", "code": code, "message": message}
+
+
+class FakeResponse(object):
+    """The parts of :class:`requests.Response` that the client reads.  ``body`` is JSON-encoded unless it is text."""
+
+    def __init__(self, body=OK, status_code=200, url="https://newsapi.org/v2/everything", headers=None):
+        self.url = url
+        self.status_code = status_code
+        self.text = json.dumps(body) if isinstance(body, (dict, list)) else body
+        self.content = self.text.encode("utf-8")
+        self.headers = {"Content-Type": "application/json"} if headers is None else headers
+
+    def json(self, **kwargs):
+        return json.loads(self.text, **kwargs)
+
+
+class FakeSession(object):
+    """Answers each request with ``respond(url, params)`` after ``delay`` seconds.
+
+    ``respond`` returns a body for a 200 response, a ``(status_code, body)`` pair or a :class:`FakeResponse`, and
+    may raise.  While ``failure`` is set, it is raised instead if it is an exception, or else used as the status
+    of an error response.  The URL, parameters and timeout of every request are kept in ``requests``, and
+    ``answered`` is set after each one.
+    """
+
+    def __init__(self, respond=None, delay=0):
+        self.respond = respond or (lambda url, params: OK)
+        self.delay = delay
+        self.failure = None
+        self.requests = []
+        self.answered = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def calls(self):
+        return len(self.requests)
+
+    @property
+    def timeouts(self):
+        return [timeout for _, _, timeout in self.requests]
+
+    def get(self, url, params=None, timeout=None, **kwargs):
+        with self._lock:
+            self.requests.append((url, params, timeout))
+        try:
+            time.sleep(self.delay)
+            if isinstance(self.failure, Exception):
+                raise self.failure
+            if self.failure is not None:
+                return FakeResponse(error_body("down"), self.failure, url=url)
+            result = self.respond(url, params or {})
+            if isinstance(result, FakeResponse):
+                return result
+            status_code, body = result if isinstance(result, tuple) else (200, result)
+            return FakeResponse(body, status_code, url=url)
+        finally:
+            self.answered.set()
@@ -0,0 +1,121 @@
+"""A local stand-in for the News API, for tests and benchmarks that need real HTTP."""
+import contextlib
+import gzip
+import io
+import json
+import threading
+import time
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import parse_qs, urlparse
+except ImportError:  # Python 2
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import parse_qs, urlparse
+
+from newsapi import const
+
+
+def make_article(index, params):
+    return {
+        "source": {"id": params.get("sources", "stub"), "name": "Stub News"},
+        "author": "Reporter %d" % index,
+        "title": "Article %d about %s" % (index, params.get("q", "everything")),
+        "description": "Description of article %d. " % index * 4,
+        "url": "https://stub.example.com/%s/%d" % (params.get("q", "all"), index),
+        "urlToImage": "https://stub.example.com/images/%d.jpg" % index,
+        "publishedAt": "2019-09-01T%02d:00:00Z" % (index % 24),
+        "content": "Body of article %d. " % index * 40,
+    }
+
+
+def default_responder(path, params):
+    """Echo the request: ``pageSize`` articles for the requested ``page``, out of ``totalResults=250``."""
+    page_size = int(params.get("pageSize", 20))
+    page = int(params.get("page", 1))
+    total = 250
+    start = (page - 1) * page_size
+    articles = [make_article(i, params) for i in range(start, min(start + page_size, total))]
+    return 200, {"status": "ok", "totalResults": total, "articles": articles}
+
+
+class _ThreadingHTTPServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class StubServer(object):
+    """Serve ``responder(path, params) -> (status, body)`` on an ephemeral localhost port.
+
+    Bodies are gzip-encoded when the client accepts it.  ``delay`` adds a fixed latency to every response.
+    """
+
+    def __init__(self, responder=default_responder, delay=0):
+        self.responder = responder
+        self.delay = delay
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = _ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, kwargs={"poll_interval": 0.05})
+        self._thread.daemon = True
+
+    def _handler_class(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.requests += 1
+                url = urlparse(self.path)
+                params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+                if stub.delay:
+                    time.sleep(stub.delay)
+                status, body = stub.responder(url.path, params)
+
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    buf = io.BytesIO()
+                    with gzip.GzipFile(fileobj=buf, mode="wb") as f:
+                        f.write(data)
+                    data = buf.getvalue()
+                    self.send_header("Content-Encoding", "gzip")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    @property
+    def base_url(self):
+        return "http://127.0.0.1:%d/v2" % self._server.server_address[1]
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @contextlib.contextmanager
+    def patch_urls(self):
+        """Point the endpoint URLs in :mod:`newsapi.const` at this server."""
+        names = ("TOP_HEADLINES_URL", "EVERYTHING_URL", "SOURCES_URL")
+        saved = {name: getattr(const, name) for name in names}
+        try:
+            for name in names:
+                setattr(const, name, self.base_url + "/" + saved[name].rsplit("/", 1)[1])
+            yield self
+        finally:
+            for name, value in saved.items():
+                setattr(const, name, value)
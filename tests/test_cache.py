@@ -0,0 +1,124 @@
+import time
+import unittest
+
+import requests
+
+from newsapi.cache import CacheBackend, ResponseCache, cache_key
+from newsapi.newsapi_client import NewsApiClient
+from newsapi.newsapi_exception import NewsAPIException
+from tests.fakes import FakeSession
+
+
+def age_entries(cache, seconds):
+    for key, (stored_at, response) in list(cache.backend._entries.items()):
+        cache.backend._entries[key] = (stored_at - seconds, response)
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        # Successful responses are numbered, so the tests can tell cached ones from fresh ones.
+        self.articles = []
+        self.session = FakeSession(
+            lambda url, params: {"status": "ok", "totalResults": 0, "articles": self.articles, "n": self.session.calls}
+        )
+        self.cache = ResponseCache(ttl=60, stale_while_revalidate=60, stale_if_error=600)
+        self.api = NewsApiClient(api_key="key", shared=True, session_factory=lambda: self.session, cache=self.cache)
+
+    def test_cache_key_ignores_order_and_none(self):
+        self.assertEqual(
+            cache_key("u", {"country": "us", "language": "en", "q": None}),
+            cache_key("u", {"language": "en", "country": "us"}),
+        )
+        self.assertNotEqual(cache_key("u", {"country": "us"}), cache_key("u", {"country": "gb"}))
+
+    def test_fresh_hit(self):
+        self.assertEqual(1, self.api.get_top_headlines(country="us")["n"])
+        self.assertEqual(1, self.api.get_top_headlines(country="us")["n"])
+        self.assertEqual(2, self.api.get_top_headlines(country="gb")["n"])
+        self.assertEqual(2, self.session.calls)
+        self.assertEqual(
+            {"hits": 1, "stale_hits": 0, "misses": 2, "filled_elsewhere": 0, "stale_on_error": 0, "entries": 2},
+            self.cache.stats(),
+        )
+
+    def test_stale_while_revalidate(self):
+        self.api.get_top_headlines(country="us")
+        age_entries(self.cache, 90)
+        self.session.answered.clear()
+
+        # The stale response comes back immediately, and a background call refreshes it.
+        self.assertEqual(1, self.api.get_top_headlines(country="us")["n"])
+        self.assertTrue(self.session.answered.wait(5))
+        for _ in range(100):
+            if not self.cache._refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(2, self.api.get_top_headlines(country="us")["n"])
+        self.assertEqual(2, self.session.calls)
+
+    def test_stale_if_error(self):
+        self.api.get_top_headlines(country="us")
+        age_entries(self.cache, 300)
+
+        self.session.failure = requests.Timeout("read timed out")
+        self.assertEqual(1, self.api.get_top_headlines(country="us")["n"])
+        self.session.failure = 500
+        self.assertEqual(1, self.api.get_top_headlines(country="us")["n"])
+        self.assertEqual(2, self.cache.stats()["stale_on_error"])
+
+        # Too old to fall back on.
+        age_entries(self.cache, 1000)
+        with self.assertRaises(NewsAPIException):
+            self.api.get_top_headlines(country="us")
+
+    def test_projections_are_cached_separately(self):
+        self.articles = [{"url": "u", "publishedAt": "2024-03-01T00:00:00Z", "title": "t", "content": "c"}]
+        slim = NewsApiClient(
+            api_key="key", shared=True, session_factory=lambda: self.session, cache=self.cache, article_fields=["title"]
+        )
+        self.assertEqual([{"title": "t"}], slim.get_everything(q="storm")["articles"])
+        full = self.api.get_everything(q="storm")["articles"][0]
+        self.assertEqual(["content", "publishedAt", "title", "url"], sorted(full))
+        self.assertEqual(2, self.session.calls)
+
+    def test_background_refresh_needs_shared_client(self):
+        with self.assertRaises(ValueError):
+            NewsApiClient(api_key="key", session=self.session, cache=self.cache)
+        NewsApiClient(api_key="key", session=self.session, cache=ResponseCache(ttl=60, stale_if_error=600))
+
+    def test_errors_without_cached_response(self):
+        self.session.failure = requests.ConnectionError("refused")
+        with self.assertRaises(requests.ConnectionError):
+            self.api.get_top_headlines(country="us")
+
+    def test_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        self.assertEqual((None, None), cache.get("b"))
+        self.assertEqual(1, cache.get("a")[0])
+        self.assertEqual(2, len(cache))
+
+    def test_minimal_backend(self):
+        class DictBackend(CacheBackend):
+            def __init__(self):
+                self.entries = {}
+
+            def get(self, key):
+                return self.entries.get(key)
+
+            def set(self, key, entry, expires_in):
+                self.entries[key] = entry
+
+            def delete(self, key):
+                self.entries.pop(key, None)
+
+            def clear(self):
+                self.entries.clear()
+
+        cache = ResponseCache(backend=DictBackend())
+        cache.set("a", 1)
+        self.assertEqual([1, None], [response for response, _ in cache.get_many(["a", "b"])])
+        self.assertIsNone(cache.stats()["entries"])
@@ -0,0 +1,123 @@
+import time
+import unittest
+
+import requests
+
+from newsapi.circuit import CircuitBreaker
+from newsapi.deadline import Deadline
+from newsapi.newsapi_client import NewsApiClient
+from newsapi.newsapi_exception import CircuitOpenError, DeadlineExceeded, NewsAPIException
+from tests.fakes import OK, FakeSession, error_body
+from tests.stub_server import StubServer
+
+
+def flaky_session(failing="everything", status=500):
+    """Fail requests to URLs containing ``failing`` with ``status``, or raise it if it is an exception."""
+
+    def respond(url, params):
+        if failing not in url:
+            return OK
+        if isinstance(status, Exception):
+            raise status
+        return status, error_body()
+
+    return FakeSession(respond)
+
+
+def fail():
+    raise NewsAPIException({"status": "error", "code": "unexpectedError", "message": "down"}, status_code=503)
+
+
+class CircuitBreakerTest(unittest.TestCase):
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60)
+        for _ in range(2):
+            self.assertRaises(NewsAPIException, breaker.call, fail)
+        # A success resets the run of failures.
+        breaker.call(lambda: None)
+        for _ in range(3):
+            self.assertRaises(NewsAPIException, breaker.call, fail)
+        self.assertEqual("open", breaker.state)
+
+        with self.assertRaises(CircuitOpenError) as cm:
+            breaker.call(lambda: None)
+        self.assertEqual("circuitOpen", cm.exception.get_code())
+        self.assertGreater(cm.exception.retry_after, 59)
+        self.assertEqual({"state": "open", "consecutive_failures": 3, "trips": 1, "rejected": 1}, breaker.stats())
+
+    def test_client_errors_do_not_trip(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+
+        def bad_request():
+            raise NewsAPIException({"status": "error", "code": "parameterInvalid", "message": "bad"}, status_code=400)
+
+        self.assertRaises(NewsAPIException, breaker.call, bad_request)
+        self.assertEqual("closed", breaker.state)
+
+    def test_slow_calls_trip(self):
+        breaker = CircuitBreaker(failure_threshold=2, latency_threshold=0.01)
+        for _ in range(2):
+            breaker.call(time.sleep, 0.02)
+        self.assertEqual("open", breaker.state)
+
+    def test_half_open_probes(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05, half_open_probes=2)
+        self.assertRaises(NewsAPIException, breaker.call, fail)
+        time.sleep(0.06)
+        self.assertEqual("half_open", breaker.state)
+
+        # A failed probe opens the breaker again.
+        self.assertRaises(NewsAPIException, breaker.call, fail)
+        self.assertEqual("open", breaker.state)
+        time.sleep(0.06)
+
+        # Only ``half_open_probes`` probes are let through, and all of them must succeed to close the breaker.
+        def probe():
+            self.assertEqual("ok", breaker.call(lambda: "ok"))
+            self.assertRaises(CircuitOpenError, breaker.call, lambda: "ok")
+            return "ok"
+
+        self.assertEqual("ok", breaker.call(probe))
+        self.assertEqual("closed", breaker.state)
+        self.assertEqual(2, breaker.stats()["trips"])
+
+
+class ClientCircuitBreakerTest(unittest.TestCase):
+    def test_breaker_per_endpoint(self):
+        session = flaky_session(status=requests.ConnectionError("refused"))
+        api = NewsApiClient(api_key="key", session=session, circuit_breaker=lambda: CircuitBreaker(failure_threshold=2))
+        for _ in range(2):
+            with self.assertRaises(requests.ConnectionError):
+                api.get_everything(q="storm")
+        with self.assertRaises(CircuitOpenError):
+            api.get_everything(q="storm")
+        self.assertEqual(2, session.calls)
+
+        # Other endpoints are unaffected.
+        self.assertEqual("ok", api.get_top_headlines(country="us")["status"])
+        states = sorted((url.rsplit("/", 1)[1], breaker.state) for url, breaker in api.circuit_breakers.items())
+        self.assertEqual([("everything", "open"), ("top-headlines", "closed")], states)
+
+    def test_timeouts_cut_short_by_deadline_trip(self):
+        breaker = CircuitBreaker(failure_threshold=3)
+        with StubServer(delay=0.3) as server, server.patch_urls(), requests.Session() as session:
+            api = NewsApiClient(api_key="key", session=session, circuit_breaker=lambda: breaker)
+            for _ in range(3):
+                with self.assertRaises(DeadlineExceeded):
+                    api.get_top_headlines(country="us", deadline=Deadline(0.1))
+            with self.assertRaises(CircuitOpenError):
+                api.get_top_headlines(country="us", deadline=Deadline(0.1))
+        self.assertEqual(1, breaker.stats()["trips"])
+
+    def test_deadline_passed_before_sending_does_not_trip(self):
+        breaker = CircuitBreaker(failure_threshold=1)
+        self.assertRaises(DeadlineExceeded, breaker.call, Deadline(-1).check)
+        self.assertEqual("closed", breaker.state)
+
+    def test_without_breaker(self):
+        session = flaky_session()
+        api = NewsApiClient(api_key="key", session=session)
+        for _ in range(10):
+            self.assertRaises(NewsAPIException, api.get_everything, q="storm")
+        self.assertEqual(10, session.calls)
+        self.assertEqual({}, api.circuit_breakers)
@@ -0,0 +1,117 @@
+import threading
+import time
+import unittest
+
+from newsapi.concurrency import AdaptiveLimiter, is_overload, run_batch
+from newsapi.newsapi_exception import NewsAPIException
+
+RATE_LIMITED = NewsAPIException({"status": "error", "code": "rateLimited", "message": "slow down"}, status_code=429)
+BAD_PARAM = NewsAPIException({"status": "error", "code": "parameterInvalid", "message": "bad"}, status_code=400)
+
+
+class AdaptiveLimiterTest(unittest.TestCase):
+    def test_invalid_settings(self):
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(initial_limit=10, max_limit=5)
+        with self.assertRaises(ValueError):
+            AdaptiveLimiter(backoff=1.5)
+
+    def test_is_overload(self):
+        self.assertTrue(is_overload(RATE_LIMITED))
+        self.assertTrue(is_overload(NewsAPIException({"code": "unexpectedError"}, status_code=503)))
+        self.assertTrue(is_overload(IOError("connection reset")))
+        self.assertFalse(is_overload(BAD_PARAM))
+        self.assertFalse(is_overload(ValueError("invalid country")))
+
+    def test_grows_on_success(self):
+        # Back-to-back calls take microseconds, so scheduling jitter alone could look like a latency spike.
+        limiter = AdaptiveLimiter(initial_limit=2, max_limit=4, latency_tolerance=1e6)
+        for _ in range(50):
+            limiter.release(limiter.acquire())
+        self.assertEqual(4, limiter.limit)
+        self.assertEqual(0, limiter.in_flight)
+
+    def test_baseline_follows_lasting_latency_shift(self):
+        limiter = AdaptiveLimiter(initial_limit=8, max_limit=8)
+
+        def complete(latency):
+            limiter.acquire()
+            limiter.release(time.time() - latency)
+
+        for _ in range(20):
+            complete(0.05)
+        self.assertAlmostEqual(0.05, limiter.baseline_latency, delta=0.005)
+
+        # Upstream latency triples and stays there: after a cut, the baseline catches up and the limit regrows.
+        for _ in range(200):
+            complete(0.15)
+        self.assertGreater(limiter.baseline_latency, 0.1)
+        self.assertEqual(8, limiter.limit)
+
+    def test_backs_off_once_per_burst(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        tokens = [limiter.acquire() for _ in range(8)]
+        for token in tokens:
+            limiter.release(token, RATE_LIMITED)
+        self.assertEqual(4, limiter.limit)
+
+        limiter.release(limiter.acquire(), NewsAPIException({}, status_code=500))
+        self.assertEqual(2, limiter.limit)
+
+    def test_ignores_client_errors(self):
+        limiter = AdaptiveLimiter(initial_limit=8)
+        limiter.release(limiter.acquire(), BAD_PARAM)
+        self.assertEqual(8, limiter.limit)
+
+    def test_backs_off_on_latency_spike(self):
+        limiter = AdaptiveLimiter(initial_limit=8, latency_tolerance=2.0)
+        limiter.release(limiter.acquire())
+        self.assertIsNotNone(limiter.baseline_latency)
+        limiter.release(limiter.acquire() - 10)
+        self.assertEqual(4, limiter.limit)
+
+    def test_acquire_blocks_at_limit(self):
+        limiter = AdaptiveLimiter(initial_limit=1, max_limit=1)
+        token = limiter.acquire()
+        acquired = threading.Event()
+
+        def second():
+            limiter.release(limiter.acquire())
+            acquired.set()
+
+        thread = threading.Thread(target=second)
+        thread.start()
+        self.assertFalse(acquired.wait(0.05))
+        limiter.release(token)
+        self.assertTrue(acquired.wait(1))
+        thread.join()
+
+
+class RunBatchTest(unittest.TestCase):
+    def test_results_in_order_within_limit(self):
+        lock = threading.Lock()
+        state = {"running": 0, "peak": 0}
+
+        def fetch(page):
+            with lock:
+                state["running"] += 1
+                state["peak"] = max(state["peak"], state["running"])
+            time.sleep(0.005)
+            with lock:
+                state["running"] -= 1
+            return page * 10
+
+        limiter = AdaptiveLimiter(initial_limit=3, max_limit=3)
+        self.assertEqual([i * 10 for i in range(20)], run_batch(fetch, [{"page": i} for i in range(20)], limiter))
+        self.assertLessEqual(state["peak"], 3)
+
+    def test_exceptions(self):
+        def fetch(page):
+            if page % 2:
+                raise BAD_PARAM
+            return page
+
+        calls = [{"page": i} for i in range(4)]
+        self.assertEqual([0, BAD_PARAM, 2, BAD_PARAM], run_batch(fetch, calls, return_exceptions=True))
+        with self.assertRaises(NewsAPIException):
+            run_batch(fetch, calls)
@@ -0,0 +1,111 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+
+from newsapi import crawl
+from newsapi.newsapi_exception import NewsAPIException
+
+
+class FakeClient(object):
+    """Serves ``total`` numbered articles and optionally fails once on ``fail_on_page``."""
+
+    def __init__(self, total, fail_on_page=None):
+        self.total = total
+        self.fail_on_page = fail_on_page
+        self.pages = []
+
+    def get_everything(self, page=None, page_size=None, **params):
+        if page == self.fail_on_page:
+            self.fail_on_page = None
+            raise NewsAPIException({"status": "error", "code": "unexpectedError", "message": "boom"})
+        self.pages.append(page)
+        start = (page - 1) * page_size
+        articles = [{"url": "https://example.com/%d" % i} for i in range(start, min(start + page_size, self.total))]
+        return {"status": "ok", "totalResults": self.total, "articles": articles}
+
+
+class PlanShardsTest(unittest.TestCase):
+    def test_windows_and_sources(self):
+        shards = crawl.plan_shards(
+            "2019-09-01", "2019-09-05", window_days=2, sources=["a", "b", "c"], sources_per_shard=2, q="storm"
+        )
+        self.assertEqual(6, len(shards))
+        self.assertEqual(len(shards), len({shard.shard_id for shard in shards}))
+        self.assertEqual(
+            {"q": "storm", "sources": "a,b", "from_param": "2019-09-01T00:00:00", "to": "2019-09-02T23:59:59"},
+            shards[0].params,
+        )
+        self.assertEqual("c", shards[1].params["sources"])
+        # The last window is clipped to the requested end date.
+        self.assertEqual("2019-09-05T00:00:00", shards[-1].params["from_param"])
+        self.assertEqual("2019-09-05T23:59:59", shards[-1].params["to"])
+
+    def test_plan_is_deterministic(self):
+        self.assertEqual(
+            crawl.plan_shards("2019-09-01", "2019-09-03", sources=["a", "b"]),
+            crawl.plan_shards("2019-09-01", "2019-09-03", sources=["a", "b"]),
+        )
+
+    def test_invalid_range(self):
+        with self.assertRaises(ValueError):
+            crawl.plan_shards("2019-09-02", "2019-09-01")
+        with self.assertRaises(ValueError):
+            crawl.plan_shards("2019-09-01", "2019-09-02", window_days=0)
+
+
+class RunShardTest(unittest.TestCase):
+    def setUp(self):
+        self.output_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.output_dir)
+        self.shard = crawl.plan_shards("2019-09-01", "2019-09-01", q="storm")[0]
+
+    def read_output(self):
+        with io.open(os.path.join(self.output_dir, "shard-00000.ndjson"), encoding="utf-8") as f:
+            return [json.loads(line)["url"] for line in f]
+
+    def test_writes_all_pages(self):
+        client = FakeClient(total=25)
+        summary = crawl.run_shard(client, self.shard, self.output_dir, page_size=10)
+        self.assertEqual({"shard": "00000", "pages": 3, "articles": 25}, summary)
+        self.assertEqual(["https://example.com/%d" % i for i in range(25)], self.read_output())
+
+    def test_resume_after_interruption(self):
+        client = FakeClient(total=25, fail_on_page=3)
+        with self.assertRaises(NewsAPIException):
+            crawl.run_shard(client, self.shard, self.output_dir, page_size=10)
+        self.assertEqual([1, 2], client.pages)
+
+        summary = crawl.run_shard(client, self.shard, self.output_dir, page_size=10)
+        self.assertEqual([1, 2, 3], client.pages)
+        self.assertEqual({"shard": "00000", "pages": 1, "articles": 25}, summary)
+        self.assertEqual(["https://example.com/%d" % i for i in range(25)], self.read_output())
+
+        # A finished shard is not fetched again.
+        crawl.run_shard(client, self.shard, self.output_dir, page_size=10)
+        self.assertEqual([1, 2, 3], client.pages)
+
+    def test_checkpoint_from_other_plan(self):
+        crawl.run_shard(FakeClient(total=5), self.shard, self.output_dir)
+        other = crawl.Shard(self.shard.shard_id, dict(self.shard.params, q="flood"))
+        with self.assertRaises(ValueError):
+            crawl.run_shard(FakeClient(total=5), other, self.output_dir)
+
+    def test_resume_with_other_page_size(self):
+        with self.assertRaises(NewsAPIException):
+            crawl.run_shard(FakeClient(total=25, fail_on_page=2), self.shard, self.output_dir, page_size=10)
+        with self.assertRaises(ValueError):
+            crawl.run_shard(FakeClient(total=25), self.shard, self.output_dir, page_size=20)
+
+    def test_resume_with_larger_max_pages(self):
+        client = FakeClient(total=25)
+        summary = crawl.run_shard(client, self.shard, self.output_dir, page_size=10, max_pages=1)
+        self.assertEqual({"shard": "00000", "pages": 1, "articles": 10}, summary)
+        crawl.run_shard(client, self.shard, self.output_dir, page_size=10, max_pages=1)
+        self.assertEqual([1], client.pages)
+
+        summary = crawl.run_shard(client, self.shard, self.output_dir, page_size=10, max_pages=5)
+        self.assertEqual({"shard": "00000", "pages": 2, "articles": 25}, summary)
+        self.assertEqual(["https://example.com/%d" % i for i in range(25)], self.read_output())
@@ -0,0 +1,130 @@
+import time
+import unittest
+
+import requests
+
+from newsapi.concurrency import run_batch
+from newsapi.deadline import Deadline
+from newsapi.newsapi_client import NewsApiClient
+from newsapi.newsapi_exception import DeadlineExceeded, NewsAPIException
+from newsapi.pagination import iter_pages
+from tests.fakes import FakeSession
+from tests.stub_server import StubServer
+
+
+class DeadlineTest(unittest.TestCase):
+    def test_remaining_and_clamp(self):
+        deadline = Deadline(10)
+        self.assertFalse(deadline.expired())
+        self.assertTrue(9 < deadline.remaining() <= 10)
+        self.assertEqual(5, deadline.clamp(5))
+        connect, read = deadline.clamp((3.05, 30))
+        self.assertEqual(3.05, connect)
+        self.assertLessEqual(read, 10)
+        self.assertLessEqual(deadline.clamp(30), 10)
+
+        expired = Deadline(-1)
+        self.assertTrue(expired.expired())
+        self.assertEqual(0, expired.remaining())
+        with self.assertRaises(DeadlineExceeded):
+            expired.check()
+        with self.assertRaises(DeadlineExceeded):
+            expired.clamp(30)
+        with self.assertRaises(DeadlineExceeded):
+            expired.clamp((3.05, 30))
+
+    def test_deadline_exceeded_is_api_exception(self):
+        self.assertTrue(issubclass(DeadlineExceeded, NewsAPIException))
+        self.assertEqual("deadlineExceeded", DeadlineExceeded().get_code())
+
+
+class ClientTimeoutTest(unittest.TestCase):
+    def test_client_and_call_timeouts(self):
+        session = FakeSession()
+        NewsApiClient(api_key="key", session=session).get_sources()
+        api = NewsApiClient(api_key="key", session=session, timeout=(3.05, 10))
+        api.get_everything(q="storm")
+        api.get_top_headlines(country="us", timeout=2)
+        self.assertEqual([30, (3.05, 10), 2], session.timeouts)
+
+    def test_invalid_timeouts(self):
+        with self.assertRaises(TypeError):
+            NewsApiClient(api_key="key", timeout="30")
+        with self.assertRaises(TypeError):
+            NewsApiClient(api_key="key", timeout=(1, 2, 3))
+        with self.assertRaises(ValueError):
+            NewsApiClient(api_key="key", timeout=0)
+        with self.assertRaises(ValueError):
+            NewsApiClient(api_key="key", session=FakeSession()).get_sources(timeout=(1, -1))
+
+    def test_deadline_caps_timeouts(self):
+        session = FakeSession()
+        api = NewsApiClient(api_key="key", session=session, timeout=(3.05, 30))
+        api.get_everything(q="storm", deadline=Deadline(1))
+        connect, read = session.timeouts[0]
+        self.assertLessEqual(connect, 1)
+        self.assertLessEqual(read, 1)
+
+    def test_expired_deadline_is_not_sent(self):
+        session = FakeSession()
+        api = NewsApiClient(api_key="key", session=session)
+        with self.assertRaises(DeadlineExceeded):
+            api.get_everything(q="storm", deadline=Deadline(-1))
+        self.assertEqual([], session.timeouts)
+
+    def test_timeout_at_deadline_is_reported_as_deadline(self):
+        session = FakeSession(delay=0.05)
+        session.failure = requests.Timeout("read timed out")
+        api = NewsApiClient(api_key="key", session=session)
+        with self.assertRaises(requests.Timeout):
+            api.get_everything(q="storm", deadline=Deadline(10))
+        with self.assertRaises(DeadlineExceeded):
+            api.get_everything(q="storm", deadline=Deadline(0.01))
+
+    def test_response_after_deadline_is_discarded(self):
+        # A server that answers slowly without tripping the read timeout, like one sending the body in pieces.
+        api = NewsApiClient(api_key="key", session=FakeSession(delay=0.05))
+        self.assertEqual("ok", api.get_everything(q="storm", deadline=Deadline(10))["status"])
+        with self.assertRaises(DeadlineExceeded) as cm:
+            api.get_everything(q="storm", deadline=Deadline(0.01))
+        self.assertTrue(cm.exception.timed_out)
+
+    def test_slow_server(self):
+        with StubServer(delay=1) as server, server.patch_urls():
+            with requests.Session() as session:
+                api = NewsApiClient(api_key="key", session=session)
+                start = time.time()
+                with self.assertRaises(DeadlineExceeded):
+                    api.get_top_headlines(country="us", deadline=Deadline(0.2))
+                self.assertLess(time.time() - start, 0.9)
+
+
+class DeadlinePropagationTest(unittest.TestCase):
+    def test_pagination(self):
+        deadlines = []
+
+        def fetch(page, page_size, deadline, **params):
+            deadlines.append(deadline)
+            if page == 2:
+                deadline.expires_at -= 100
+            return {"status": "ok", "totalResults": 100, "articles": [{}] * page_size}
+
+        deadline = Deadline(10)
+        pages = []
+        with self.assertRaises(DeadlineExceeded):
+            for page, _ in iter_pages(fetch, page_size=10, deadline=deadline):
+                pages.append(page)
+        self.assertEqual([1, 2], pages)
+        self.assertEqual([deadline, deadline], deadlines)
+
+    def test_batch(self):
+        calls = []
+
+        def fetch(page, deadline):
+            calls.append(page)
+            return page
+
+        self.assertEqual([1, 2], run_batch(fetch, [{"page": 1}, {"page": 2}], deadline=Deadline(10)))
+        results = run_batch(fetch, [{"page": 3}, {"page": 4}], deadline=Deadline(-1), return_exceptions=True)
+        self.assertTrue(all(isinstance(result, DeadlineExceeded) for result in results))
+        self.assertEqual([1, 2], sorted(calls))
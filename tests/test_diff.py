@@ -0,0 +1,57 @@
+import unittest
+
+from newsapi.diff import ADDED, MOVED, REMOVED, DiffEvent, SnapshotDiffer, diff_snapshot, fingerprint
+
+
+def snapshot(*names):
+    return {"status": "ok", "articles": [{"url": "https://example.com/%s" % name, "title": name} for name in names]}
+
+
+def summary(events):
+    return [(event.kind, event.url.rsplit("/", 1)[1], event.rank, event.previous_rank) for event in events]
+
+
+class SnapshotDifferTest(unittest.TestCase):
+    def test_first_snapshot_is_all_added(self):
+        differ = SnapshotDiffer()
+        events = differ.update(("us", "business"), snapshot("a", "b"))
+        self.assertEqual([(ADDED, "a", 1, None), (ADDED, "b", 2, None)], summary(events))
+        self.assertEqual("a", events[0].article["title"])
+
+    def test_added_removed_and_moved(self):
+        differ = SnapshotDiffer()
+        differ.update("us", snapshot("a", "b", "c", "d"))
+        events = differ.update("us", snapshot("c", "b", "e", "a"))
+        self.assertEqual(
+            [(MOVED, "c", 1, 3), (ADDED, "e", 3, None), (MOVED, "a", 4, 1), (REMOVED, "d", None, 4)], summary(events)
+        )
+        self.assertIsNone(events[-1].article)
+        self.assertEqual([], differ.update("us", snapshot("c", "b", "e", "a")))
+
+    def test_feeds_are_independent(self):
+        differ = SnapshotDiffer()
+        differ.update("us", snapshot("a"))
+        self.assertEqual([(ADDED, "a", 1, None)], summary(differ.update("gb", snapshot("a"))))
+
+    def test_keeps_only_fingerprints(self):
+        differ = SnapshotDiffer()
+        differ.update("us", snapshot("a", "b"))
+        self.assertEqual({"us": {"https://example.com/a": 1, "https://example.com/b": 2}}, differ.fingerprints)
+
+        resumed = SnapshotDiffer(differ.fingerprints)
+        events = resumed.update("us", snapshot("b")["articles"])
+        self.assertEqual([(MOVED, "b", 1, 2), (REMOVED, "a", None, 1)], summary(events))
+
+    def test_duplicates_and_missing_urls(self):
+        articles = [{"url": "u1"}, {"url": None}, {"title": "no url"}, {"url": "u1"}, {"url": "u2"}]
+        self.assertEqual({"u1": 1, "u2": 2}, fingerprint(articles))
+        events, current = diff_snapshot({"u2": 2}, articles)
+        self.assertEqual([DiffEvent(ADDED, "u1", 1, None, {"url": "u1"})], events)
+        self.assertEqual({"u1": 1, "u2": 2}, current)
+
+    def test_large_snapshots(self):
+        previous = fingerprint({"url": "u%d" % i} for i in range(100000))
+        events, _ = diff_snapshot(previous, [{"url": "u%d" % i} for i in range(1, 100001)])
+        self.assertEqual(100001, len(events))
+        self.assertEqual((ADDED, "u100000"), events[-2][:2])
+        self.assertEqual((REMOVED, "u0"), events[-1][:2])
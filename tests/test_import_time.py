@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+import unittest
+
+# Regression threshold for importing the client in a fresh interpreter; it takes a few milliseconds
+# once ``requests`` is deferred, against well over 50 ms when it is imported eagerly.  Wall-clock limits
+# are unreliable on shared machines, so it is only checked when NEWSAPI_TIMING_TESTS is set; see also
+# benchmarks/import_time.py.
+IMPORT_TIME_BUDGET = 0.05
+
+_SNIPPET = """
+import sys, time
+start = time.time()
+from newsapi import NewsApiClient
+elapsed = time.time() - start
+NewsApiClient(api_key="key")
+print(elapsed, "requests" in sys.modules)
+"""
+
+
+class ImportTimeTest(unittest.TestCase):
+    def run_snippet(self):
+        out = subprocess.check_output([sys.executable, "-c", _SNIPPET]).decode("ascii").split()
+        return float(out[0]), out[1] == "True"
+
+    def test_requests_is_deferred(self):
+        _, requests_imported = self.run_snippet()
+        self.assertFalse(requests_imported)
+
+    @unittest.skipUnless(os.environ.get("NEWSAPI_TIMING_TESTS"), "set NEWSAPI_TIMING_TESTS to check timings")
+    def test_import_time_budget(self):
+        elapsed = min(self.run_snippet()[0] for _ in range(3))
+        self.assertLess(elapsed, IMPORT_TIME_BUDGET)
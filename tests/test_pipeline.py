@@ -0,0 +1,106 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+
+from newsapi.pagination import iter_pages
+from newsapi.pipeline import FileSink, MemorySink, NDJSONSink, Pipeline
+
+try:
+    import queue
+except ImportError:  # Python 2
+    import Queue as queue
+
+
+def fetch(page, page_size, **params):
+    articles = [{"url": "https://example.com/%d" % (page * page_size + i)} for i in range(page_size)]
+    return {"status": "ok", "totalResults": 50, "articles": articles}
+
+
+class FailingSink(MemorySink):
+    def write_batch(self, articles):
+        raise IOError("sink is down")
+
+
+class PipelineTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp)
+
+    def test_fan_out_to_every_sink(self):
+        memory = MemorySink()
+        path = os.path.join(self.tmp, "articles.ndjson")
+        urls_path = os.path.join(self.tmp, "urls.txt")
+        with Pipeline([memory, NDJSONSink(path), FileSink(urls_path, lambda a: a["url"])], batch_size=20) as pipeline:
+            self.assertEqual(50, pipeline.feed(iter_pages(fetch, page_size=10)))
+
+        self.assertTrue(memory.closed)
+        self.assertEqual([20, 20, 10], [len(batch) for batch in memory.batches])
+        with io.open(path, encoding="utf-8") as f:
+            self.assertEqual(memory.articles, [json.loads(line) for line in f])
+        with io.open(urls_path, encoding="utf-8") as f:
+            self.assertEqual([article["url"] for article in memory.articles], f.read().splitlines())
+        self.assertEqual([{"queued": 0, "written": 50, "batches": 3}] * 3, pipeline.stats())
+
+    def test_flush_interval(self):
+        sink = MemorySink()
+        pipeline = Pipeline([sink], batch_size=100, flush_interval=0.05)
+        self.addCleanup(pipeline.close)
+        pipeline.put({"url": "a"})
+        for _ in range(100):
+            if sink.batches:
+                break
+            time.sleep(0.01)
+        self.assertEqual([[{"url": "a"}]], sink.batches)
+
+    def test_backpressure(self):
+        slow = MemorySink(delay=0.2)
+        pipeline = Pipeline([slow, MemorySink()], batch_size=1, max_queued=2)
+        self.addCleanup(pipeline.close)
+        for i in range(3):
+            pipeline.put({"url": str(i)})
+        # The slow sink is writing one article and has two queued, so there is no room for another.
+        with self.assertRaises(queue.Full):
+            pipeline.put({"url": "3"}, timeout=0.05)
+
+    def test_put_that_times_out_can_be_retried(self):
+        slow, fast = MemorySink(delay=0.2), MemorySink()
+        pipeline = Pipeline([fast, slow], batch_size=1, max_queued=2)
+        for i in range(3):
+            pipeline.put({"url": str(i)})
+        # The slow sink has no room, so the article is queued for neither sink.
+        with self.assertRaises(queue.Full):
+            pipeline.put({"url": "3"}, timeout=0.05)
+        pipeline.put({"url": "3"})
+        pipeline.close()
+        expected = [{"url": str(i)} for i in range(4)]
+        self.assertEqual(expected, fast.articles)
+        self.assertEqual(expected, slow.articles)
+
+    @unittest.skipUnless(os.environ.get("NEWSAPI_TIMING_TESTS"), "set NEWSAPI_TIMING_TESTS to check timings")
+    def test_delivery_overlaps_fetching(self):
+        sink = MemorySink(delay=0.05)
+
+        def slow_fetch(page, page_size, **params):
+            time.sleep(0.05)
+            return fetch(page, page_size)
+
+        start = time.time()
+        with Pipeline([sink], batch_size=10) as pipeline:
+            pipeline.feed(iter_pages(slow_fetch, page_size=10))
+        # Five pages fetched and five batches written take about 0.3s overlapped, 0.5s in sequence.
+        self.assertLess(time.time() - start, 0.45)
+        self.assertEqual(50, len(sink.articles))
+
+    def test_sink_error_reaches_producer(self):
+        pipeline = Pipeline([FailingSink(), MemorySink()], batch_size=1)
+        pipeline.put({"url": "a"})
+        with self.assertRaises(IOError):
+            for _ in range(100):
+                time.sleep(0.01)
+                pipeline.put({"url": "b"})
+        with self.assertRaises(IOError):
+            pipeline.close()
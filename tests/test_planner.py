@@ -0,0 +1,104 @@
+import unittest
+
+from newsapi.planner import MergedQuery, plan_queries, run_queries
+
+
+def article(source, day, host="example.com"):
+    return {
+        "source": {"id": source, "name": source},
+        "url": "https://www.%s/%s/%s" % (host, source, day),
+        "publishedAt": "2024-03-%02dT12:00:00Z" % day,
+    }
+
+
+class FakeClient(object):
+    """Serves a fixed set of articles, filtered by sources, domains and dates like the API."""
+
+    def __init__(self, articles):
+        self.articles = articles
+        self.calls = []
+
+    def get_everything(self, page=1, page_size=100, sources=None, domains=None, from_param=None, to=None, **params):
+        self.calls.append(dict(params, sources=sources, domains=domains, from_param=from_param, to=to, page=page))
+        if from_param is not None and len(from_param) == 10:
+            from_param += "T00:00:00"
+        if to is not None and len(to) == 10:
+            to += "T23:59:59"
+        matching = [
+            a for a in self.articles
+            if (sources is None or a["source"]["id"] in sources.split(","))
+            and (domains is None or any(d in a["url"] for d in domains.split(",")))
+            and (from_param is None or a["publishedAt"][:19] >= from_param)
+            and (to is None or a["publishedAt"][:19] <= to)
+        ]
+        start = (page - 1) * page_size
+        return {"status": "ok", "totalResults": len(matching), "articles": matching[start:start + page_size]}
+
+
+class PlanQueriesTest(unittest.TestCase):
+    def test_merges_sources_and_overlapping_windows(self):
+        specs = {
+            "a": {"q": "bitcoin", "sources": "bbc-news", "from_param": "2024-03-01", "to": "2024-03-02"},
+            "b": {"q": "bitcoin", "sources": ["cnn", "bbc-news"], "from_param": "2024-03-02", "to": "2024-03-03"},
+            # A disjoint window, a different query and a domain filter each need their own call.
+            "c": {"q": "bitcoin", "sources": "cnn", "from_param": "2024-03-10", "to": "2024-03-11"},
+            "d": {"q": "ethereum", "sources": "cnn", "from_param": "2024-03-01", "to": "2024-03-02"},
+            "e": {"q": "bitcoin", "domains": "wsj.com", "from_param": "2024-03-01", "to": "2024-03-02"},
+        }
+        plan = plan_queries(specs)
+        self.assertEqual(4, len(plan))
+        merged = [query for query in plan if len(query.members) > 1]
+        self.assertEqual(
+            [
+                MergedQuery(
+                    {
+                        "q": "bitcoin",
+                        "sources": "bbc-news,cnn",
+                        "from_param": "2024-03-01T00:00:00",
+                        "to": "2024-03-03T23:59:59",
+                    },
+                    ("a", "b"),
+                )
+            ],
+            merged,
+        )
+
+    def test_source_limit(self):
+        specs = dict(("s%d" % i, {"q": "x", "sources": "source-%d" % i}) for i in range(45))
+        plan = plan_queries(specs)
+        self.assertEqual([20, 20, 5], [len(query.members) for query in plan])
+        self.assertEqual(3, len(plan_queries(specs, max_sources=15)))
+
+    def test_paging_params_are_rejected(self):
+        with self.assertRaises(ValueError):
+            plan_queries({"a": {"q": "x", "page": 2}})
+
+
+class RunQueriesTest(unittest.TestCase):
+    def test_demultiplexes_articles(self):
+        articles = [article(source, day) for source in ("bbc-news", "cnn", "reuters") for day in range(1, 6)]
+        articles.append(article("wsj", 2, host="wsj.com"))
+        client = FakeClient(articles)
+        specs = {
+            "a": {"q": "x", "sources": "bbc-news", "from_param": "2024-03-01", "to": "2024-03-02"},
+            "b": {"q": "x", "sources": "cnn,reuters", "from_param": "2024-03-02", "to": "2024-03-04"},
+            "c": {"q": "x", "sources": "cnn", "from_param": "2024-03-04T00:00:00", "to": "2024-03-05"},
+            "d": {"q": "x", "domains": "wsj.com"},
+        }
+
+        results, report = run_queries(client, specs, page_size=4)
+        for spec_id, spec in specs.items():
+            expected = FakeClient(articles).get_everything(page_size=100, **spec)["articles"]
+            self.assertEqual(expected, results[spec_id], spec_id)
+
+        # The merged source query has 15 articles, so it takes four pages of four.
+        self.assertEqual({"queries": 4, "upstream_queries": 2, "queries_merged": 2, "calls": 5}, report)
+        self.assertEqual(4, sum(call["sources"] == "bbc-news,cnn,reuters" for call in client.calls))
+
+    def test_max_pages_scales_with_members(self):
+        articles = [article(source, day) for source in ("bbc-news", "cnn") for day in range(1, 6)]
+        client = FakeClient(articles)
+        specs = {"a": {"q": "x", "sources": "bbc-news"}, "b": {"q": "x", "sources": "cnn"}}
+        results, report = run_queries(client, specs, page_size=2, max_pages=1)
+        self.assertEqual(2, report["calls"])
+        self.assertEqual(4, sum(len(found) for found in results.values()))
@@ -0,0 +1,116 @@
+import io
+import time
+import unittest
+
+import requests
+
+from newsapi.cache import ResponseCache
+from newsapi.newsapi_auth import NewsApiAuth
+from newsapi.newsapi_client import NewsApiClient
+from newsapi.profiling import Profiler
+from tests.stub_server import StubServer
+
+
+class ProfilerTest(unittest.TestCase):
+    def test_nested_stages(self):
+        profiler = Profiler()
+        with profiler.stage("call"):
+            time.sleep(0.02)
+            with profiler.stage("inner"):
+                time.sleep(0.01)
+        profiler.begin("call")
+        profiler.begin("left-open")
+        profiler.end("call")
+
+        stats = profiler.stats()
+        self.assertEqual(["call", "call;inner", "call;left-open"], sorted(stats))
+        self.assertEqual(2, stats["call"]["calls"])
+        self.assertGreaterEqual(stats["call"]["wall"], stats["call;inner"]["wall"] + 0.02)
+
+        out = io.StringIO()
+        profiler.dump_collapsed(out)
+        lines = dict(line.rsplit(" ", 1) for line in out.getvalue().splitlines())
+        self.assertIn("call;inner", lines)
+        self.assertAlmostEqual(stats["call"]["wall"] * 1e6, sum(int(value) for value in lines.values()), delta=5)
+        with self.assertRaises(ValueError):
+            profiler.dump_collapsed(out, metric="bogus")
+
+    def test_wrap_callable_object(self):
+        profiler = Profiler()
+        auth = profiler.wrap("auth", NewsApiAuth("secret"))
+        self.assertFalse(hasattr(auth, "api_key"))
+
+        class Request(object):
+            headers = {}
+
+        self.assertEqual("secret", auth(Request()).headers["Authorization"])
+        self.assertEqual(["auth"], list(profiler.stats()))
+
+    def test_unmatched_end_is_ignored(self):
+        profiler = Profiler()
+        profiler.end("validate")
+        self.assertEqual({}, profiler.stats())
+
+
+class ClientProfilingTest(unittest.TestCase):
+    def setUp(self):
+        self.profiler = Profiler()
+
+    def test_client_stages(self):
+        with StubServer() as server, server.patch_urls(), requests.Session() as session:
+            api = NewsApiClient(api_key="key", session=session, profiler=self.profiler)
+            for _ in range(3):
+                api.get_everything(q="storm", page_size=50)
+            with self.assertRaises(TypeError):
+                api.get_everything(q="storm", sources=1)
+
+        stats = self.profiler.stats()
+        self.assertEqual(
+            [
+                "get_everything",
+                "get_everything;decode",
+                "get_everything;transport",
+                "get_everything;transport;auth",
+                "get_everything;validate",
+            ],
+            sorted(stats),
+        )
+        self.assertEqual(4, stats["get_everything"]["calls"])
+        self.assertEqual(4, stats["get_everything;validate"]["calls"])
+        self.assertEqual(3, stats["get_everything;decode"]["calls"])
+        self.assertGreater(stats["get_everything;transport"]["wall"], stats["get_everything;transport;auth"]["wall"])
+        self.assertIn("get_everything;decode", self.profiler.report())
+
+    def test_allocations(self):
+        try:
+            import tracemalloc
+        except ImportError:  # Python 2
+            self.assertRaises(ValueError, Profiler, trace_allocations=True)
+            self.skipTest("tracemalloc needs Python 3.4 or later")
+        if not tracemalloc.is_tracing():
+            self.addCleanup(tracemalloc.stop)
+        profiler = Profiler(trace_allocations=True)
+        with StubServer() as server, server.patch_urls(), requests.Session() as session:
+            NewsApiClient(api_key="key", session=session, profiler=profiler).get_everything(q="storm", page_size=50)
+        # The decoded articles are still referenced once decoding ends.
+        self.assertGreater(profiler.stats()["get_everything;decode"]["alloc_bytes"], 10000)
+
+    def test_background_refresh_stage(self):
+        cache = ResponseCache(ttl=0, stale_while_revalidate=60)
+        with StubServer() as server, server.patch_urls():
+            with NewsApiClient(api_key="key", shared=True, cache=cache, profiler=self.profiler) as api:
+                api.get_sources()
+                api.get_sources()
+                for _ in range(200):
+                    if "refresh" in self.profiler.stats():
+                        break
+                    time.sleep(0.01)
+
+        stats = self.profiler.stats()
+        self.assertEqual(1, stats["refresh"]["calls"])
+        self.assertIn("refresh;decode", stats)
+        self.assertNotIn("transport", stats)
+
+    def test_disabled_by_default(self):
+        api = NewsApiClient(api_key="key")
+        self.assertIsNone(api.profiler)
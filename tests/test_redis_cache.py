@@ -0,0 +1,209 @@
+import fnmatch
+import threading
+import time
+import unittest
+
+from newsapi import const
+from newsapi.cache import ResponseCache, cache_key
+from newsapi.newsapi_client import NewsApiClient
+from newsapi.redis_cache import HashRing, RedisBackend
+from tests.fakes import FakeSession
+
+
+class FakeConnectionPool(object):
+    def __init__(self, host):
+        self.connection_kwargs = {"host": host, "port": 6379, "db": 0}
+
+
+class FakeRedis(object):
+    """An in-process stand-in for the parts of ``redis.Redis`` used by :class:`RedisBackend`."""
+
+    def __init__(self, host="localhost"):
+        self.connection_pool = FakeConnectionPool(host)
+        self.data = {}
+        self.expiry = {}
+        self.round_trips = 0
+        self.lock = threading.Lock()
+
+    def _live(self, name):
+        if name in self.expiry and self.expiry[name] <= time.time():
+            self.data.pop(name, None)
+            self.expiry.pop(name, None)
+        return self.data.get(name)
+
+    def get(self, name):
+        with self.lock:
+            self.round_trips += 1
+            return self._live(name)
+
+    def set(self, name, value, ex=None, nx=False):
+        with self.lock:
+            self.round_trips += 1
+            if nx and self._live(name) is not None:
+                return None
+            self.data[name] = value
+            if ex is not None:
+                self.expiry[name] = time.time() + ex
+            return True
+
+    def delete(self, *names):
+        with self.lock:
+            self.round_trips += 1
+            return sum(self.data.pop(name, None) is not None for name in names)
+
+    def scan_iter(self, match="*"):
+        with self.lock:
+            names = [name for name in self.data if fnmatch.fnmatchcase(name, match)]
+        return iter(names)
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+class FakePipeline(object):
+    def __init__(self, redis):
+        self.redis = redis
+        self.names = []
+
+    def get(self, name):
+        self.names.append(name)
+
+    def execute(self):
+        with self.redis.lock:
+            self.redis.round_trips += 1
+            return [self.redis._live(name) for name in self.names]
+
+
+def echo(url, params):
+    return {"status": "ok", "totalResults": 0, "articles": [], "params": params}
+
+
+class HashRingTest(unittest.TestCase):
+    def test_spread_and_stability(self):
+        keys = ["query-%d" % i for i in range(3000)]
+        ring = HashRing(["a", "b", "c"])
+        counts = [0, 0, 0]
+        for key in keys:
+            counts[ring.index(key)] += 1
+        self.assertTrue(all(count > 600 for count in counts), counts)
+
+        # Adding a node only moves keys onto the new node.
+        grown = HashRing(["a", "b", "c", "d"])
+        for key in keys:
+            if grown.node(key) != "d":
+                self.assertEqual(ring.node(key), grown.node(key))
+
+    def test_removing_a_node_only_moves_its_keys(self):
+        keys = ["query-%d" % i for i in range(3000)]
+        ring = HashRing(["a", "b", "c"])
+        shrunk = HashRing(["b", "c"])
+        for key in keys:
+            if ring.node(key) != "a":
+                self.assertEqual(ring.node(key), shrunk.node(key))
+
+    def test_node_order_does_not_matter(self):
+        keys = ["query-%d" % i for i in range(3000)]
+        ring = HashRing(["a", "b", "c"])
+        reordered = HashRing(["c", "a", "b"])
+        self.assertEqual([ring.node(key) for key in keys], [reordered.node(key) for key in keys])
+
+    def test_names(self):
+        ring = HashRing([object(), object()], names=["x", "y"])
+        self.assertEqual(["x", "y"], ring.names)
+        with self.assertRaises(ValueError):
+            HashRing(["a", "b"], names=["x"])
+        with self.assertRaises(ValueError):
+            HashRing(["a", "b"], names=["x", "x"])
+
+
+class RedisBackendTest(unittest.TestCase):
+    def setUp(self):
+        self.servers = [FakeRedis("cache-%d" % i) for i in range(3)]
+        self.backend = RedisBackend(self.servers)
+
+    def test_servers_are_named_by_address(self):
+        self.assertEqual(["cache-0:6379/0", "cache-1:6379/0", "cache-2:6379/0"], self.backend.ring.names)
+        # Another machine listing the servers in a different order puts every key on the same server.
+        other = RedisBackend(self.servers[::-1])
+        for key in ("query-%d" % i for i in range(300)):
+            self.assertIs(self.backend.ring.node(key), other.ring.node(key))
+
+        with self.assertRaises(ValueError):
+            RedisBackend([object()])
+        self.assertEqual(["x"], RedisBackend([object()], names=["x"]).ring.names)
+
+    def test_round_trip_is_compressed(self):
+        response = {"status": "ok", "articles": [{"title": "Storm warning", "content": "x" * 1000}]}
+        self.backend.set("key", (1000.0, response), 90)
+        self.assertEqual((1000.0, response), self.backend.get("key"))
+        payload = self.backend.ring.node("key").data["newsapi:r:key"]
+        self.assertLess(len(payload), 200)
+        self.assertIsNone(self.backend.get("missing"))
+        self.assertEqual(1, sum(len(server.data) for server in self.servers))
+        self.assertIsNone(self.backend.size())
+
+        self.backend.delete("key")
+        self.assertIsNone(self.backend.get("key"))
+
+    def test_get_many_pipelines_per_shard(self):
+        keys = ["query-%d" % i for i in range(30)]
+        for i, key in enumerate(keys[::2]):
+            self.backend.set(key, (1000.0, {"n": i}), 90)
+        for server in self.servers:
+            server.round_trips = 0
+
+        entries = self.backend.get_many(keys)
+        self.assertEqual([{"n": i} for i in range(15)], [entry[1] for entry in entries[::2]])
+        self.assertEqual([None] * 15, entries[1::2])
+        self.assertEqual([1, 1, 1], [server.round_trips for server in self.servers])
+
+    def test_unreadable_payload_is_a_miss(self):
+        self.backend.ring.node("key").data["newsapi:r:key"] = b"not zlib"
+        self.assertIsNone(self.backend.get("key"))
+
+    def test_claim_and_clear(self):
+        self.assertTrue(self.backend.claim("key", 60))
+        self.assertFalse(self.backend.claim("key", 60))
+        self.backend.set("key", (1000.0, {}), 90)
+        self.backend.clear()
+        self.assertEqual(0, sum(len(server.data) for server in self.servers))
+        self.assertTrue(self.backend.claim("key", 60))
+
+    def test_fleet_shares_one_upstream_call(self):
+        # Three nodes, each with its own client, share one set of cache servers.
+        sessions = [FakeSession(echo) for _ in range(3)]
+        nodes = [
+            NewsApiClient(api_key="key", session=session, cache=ResponseCache(ttl=60, backend=self.backend))
+            for session in sessions
+        ]
+        for api in nodes:
+            self.assertEqual({"country": "us", "language": "en"}, api.get_top_headlines(country="us")["params"])
+        self.assertEqual([1, 0, 0], [session.calls for session in sessions])
+
+    def test_concurrent_misses_wait_for_one_fill(self):
+        sessions = [FakeSession(echo, delay=0.2) for _ in range(3)]
+        nodes = [
+            NewsApiClient(
+                api_key="key", session=session, cache=ResponseCache(ttl=60, backend=self.backend, fill_wait=2)
+            )
+            for session in sessions
+        ]
+        results = []
+        threads = [
+            threading.Thread(target=lambda api=api: results.append(api.get_top_headlines(country="us")))
+            for api in nodes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(1, sum(session.calls for session in sessions))
+        self.assertEqual(3, len(results))
+        self.assertEqual(2, sum(api.cache.stats()["filled_elsewhere"] for api in nodes))
+
+        key = cache_key(const.TOP_HEADLINES_URL, {"country": "us", "language": "en"})
+        (cached, age), missing = nodes[2].cache.get_many([key, "missing"])
+        self.assertEqual("us", cached["params"]["country"])
+        self.assertLess(age, 5)
+        self.assertEqual((None, None), missing)
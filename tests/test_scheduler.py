@@ -0,0 +1,112 @@
+import threading
+import time
+import unittest
+
+from newsapi.deadline import Deadline
+from newsapi.newsapi_exception import DeadlineExceeded, NewsAPIException
+from newsapi.scheduler import PriorityClass, Scheduler
+
+
+class GatedClient(object):
+    """Records call order; every call blocks until ``gate`` is set."""
+
+    def __init__(self):
+        self.gate = threading.Event()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_everything(self, q=None, deadline=None):
+        self.gate.wait(5)
+        with self.lock:
+            self.calls.append(q)
+        return {"status": "ok", "q": q}
+
+
+CLASSES = [
+    PriorityClass("interactive", priority=0),
+    PriorityClass("background", priority=1, max_concurrency=1, quota_share=0.5),
+]
+
+
+class SchedulerTest(unittest.TestCase):
+    def setUp(self):
+        self.client = GatedClient()
+
+    def make_scheduler(self, **kwargs):
+        scheduler = Scheduler(self.client, CLASSES, **kwargs)
+        self.addCleanup(scheduler.shutdown, cancel_queued=True)
+        self.addCleanup(self.client.gate.set)
+        return scheduler
+
+    def test_priority_order(self):
+        scheduler = self.make_scheduler(max_concurrency=1)
+        # Occupy the only worker so the rest queue up.
+        first = scheduler.submit("background", "get_everything", q="b0")
+        time.sleep(0.1)
+        jobs = [scheduler.submit("background", "get_everything", q="b%d" % i) for i in range(1, 3)]
+        jobs += [scheduler.submit("interactive", "get_everything", q="i%d" % i) for i in range(2)]
+        self.client.gate.set()
+        for job in [first] + jobs:
+            job.result(5)
+        self.assertEqual(["b0", "i0", "i1", "b1", "b2"], self.client.calls)
+
+        metrics = scheduler.metrics()
+        self.assertEqual(2, metrics["interactive"]["completed"])
+        self.assertEqual(3, metrics["background"]["completed"])
+        self.assertGreater(metrics["background"]["wait_p99"], metrics["interactive"]["wait_p50"])
+
+    def test_class_concurrency_cap(self):
+        scheduler = self.make_scheduler(max_concurrency=4)
+        for i in range(3):
+            scheduler.submit("background", "get_everything", q="b%d" % i)
+        time.sleep(0.1)
+        self.assertEqual(1, scheduler.metrics()["background"]["running"])
+        self.assertEqual(2, scheduler.metrics()["background"]["queued"])
+
+    def test_quota_share(self):
+        self.client.gate.set()
+        scheduler = self.make_scheduler(max_concurrency=2, quota=(4, 60))
+        jobs = [scheduler.submit("background", "get_everything", q="b%d" % i) for i in range(3)]
+        jobs[1].result(5)
+        time.sleep(0.1)
+        # The background class may only use half of the four calls in this period.
+        self.assertFalse(jobs[2].done())
+        self.assertEqual({"status": "ok", "q": "i"}, scheduler.submit("interactive", "get_everything", q="i").result(5))
+
+    def test_deadline_order_and_expiry(self):
+        scheduler = self.make_scheduler(max_concurrency=1)
+        scheduler.submit("interactive", "get_everything", q="blocker")
+        time.sleep(0.1)
+        late = scheduler.submit("interactive", "get_everything", deadline=10, q="late")
+        soon = scheduler.submit("interactive", "get_everything", deadline=Deadline(5), q="soon")
+        expired = scheduler.submit("interactive", "get_everything", deadline=0.01, q="expired")
+        time.sleep(0.05)
+        self.client.gate.set()
+        late.result(5)
+        soon.result(5)
+        with self.assertRaises(DeadlineExceeded) as cm:
+            expired.result(5)
+        self.assertEqual("deadlineExceeded", cm.exception.get_code())
+        self.assertEqual(["blocker", "soon", "late"], self.client.calls)
+
+    def test_preemption(self):
+        scheduler = self.make_scheduler(max_concurrency=1, max_queued=2)
+        scheduler.submit("interactive", "get_everything", q="blocker")
+        time.sleep(0.1)
+        b1 = scheduler.submit("background", "get_everything", q="b1")
+        b2 = scheduler.submit("background", "get_everything", q="b2")
+
+        with self.assertRaises(NewsAPIException) as cm:
+            scheduler.submit("interactive", "get_everything", q="i")
+        self.assertEqual("queueFull", cm.exception.get_code())
+
+        interactive = scheduler.submit("interactive", "get_everything", preempt=True, q="i")
+        with self.assertRaises(NewsAPIException) as cm:
+            b2.result(5)
+        self.assertEqual("preempted", cm.exception.get_code())
+
+        self.assertEqual(1, scheduler.cancel_queued("background"))
+        with self.assertRaises(NewsAPIException):
+            b1.result(5)
+        self.client.gate.set()
+        self.assertEqual("i", interactive.result(5)["q"])
@@ -0,0 +1,83 @@
+import os
+import threading
+import time
+import unittest
+
+from newsapi.newsapi_client import NewsApiClient
+from tests.stub_server import StubServer
+
+
+def run_threads(count, target):
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.time() - start
+
+
+class SharedClientTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer(delay=0.01)
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        patcher = self.server.patch_urls()
+        patcher.__enter__()
+        self.addCleanup(patcher.__exit__, None, None, None)
+
+        self.api = NewsApiClient(api_key="key", shared=True)
+        self.addCleanup(self.api.close)
+
+    def test_rejects_single_session(self):
+        with self.assertRaises(ValueError):
+            NewsApiClient(api_key="key", session=object(), shared=True)
+
+    def test_hundreds_of_threads(self):
+        threads, calls_per_thread = 200, 3
+        errors = []
+
+        def work(i):
+            try:
+                for page in range(1, calls_per_thread + 1):
+                    q = "thread%d" % i
+                    data = self.api.get_everything(q=q, page=page, page_size=5)
+                    urls = [article["url"] for article in data["articles"]]
+                    expected = ["https://stub.example.com/%s/%d" % (q, n) for n in range((page - 1) * 5, page * 5)]
+                    self.assertEqual(expected, urls)
+                    # Per-call state is per thread: this thread's own last response.
+                    self.assertIn("q=%s&" % q, self.api.last_transfer.url + "&")
+            except Exception as e:
+                errors.append(e)
+
+        run_threads(threads, work)
+        self.assertEqual([], errors)
+        self.assertEqual(threads * calls_per_thread, self.api.transfer_totals()["calls"])
+        self.assertEqual(threads * calls_per_thread, self.server.requests)
+        # The pool only grows to the peak number of concurrent calls.
+        self.assertLessEqual(len(self.api._owned_sessions), threads)
+        self.assertEqual(len(self.api._owned_sessions), len(self.api._idle_sessions))
+
+        self.api.close()
+        self.assertEqual([], self.api._owned_sessions)
+
+    # Wall-clock ratios are unreliable on shared machines, such as CI runners.
+    @unittest.skipUnless(os.environ.get("NEWSAPI_TIMING_TESTS"), "set NEWSAPI_TIMING_TESTS to check timings")
+    def test_throughput_scales_with_threads(self):
+        # Small responses keep client and server CPU (which share the GIL here) out of the measurement.
+        self.server.delay = 0.02
+        calls = 64
+
+        def sequential(_):
+            for _ in range(calls):
+                self.api.get_top_headlines(country="us", page_size=1)
+
+        def parallel(_):
+            for _ in range(calls // 32):
+                self.api.get_top_headlines(country="us", page_size=1)
+
+        # Fill the session pool up front so only steady-state calls are timed.
+        run_threads(32, lambda _: self.api.get_top_headlines(country="us", page_size=1))
+        one_thread = run_threads(1, sequential)
+        many_threads = run_threads(32, parallel)
+        self.assertGreater(one_thread / many_threads, 4)
@@ -0,0 +1,52 @@
+import unittest
+
+import requests
+
+from newsapi import transfer
+from newsapi.newsapi_client import NewsApiClient
+from tests.stub_server import StubServer
+
+
+class AcceptEncodingTest(unittest.TestCase):
+    def test_offers_gzip_and_deflate(self):
+        encodings = transfer.accept_encoding().split(", ")
+        self.assertEqual(["gzip", "deflate"], encodings[:2])
+
+
+class TransferStatsTest(unittest.TestCase):
+    def setUp(self):
+        self.server = StubServer()
+        self.server.__enter__()
+        self.addCleanup(self.server.__exit__, None, None, None)
+        patcher = self.server.patch_urls()
+        patcher.__enter__()
+        self.addCleanup(patcher.__exit__, None, None, None)
+
+        self.session = requests.Session()
+        self.addCleanup(self.session.close)
+
+    def test_reports_wire_and_decoded_bytes(self):
+        api = NewsApiClient(api_key="key", session=self.session)
+        self.assertIsNone(api.last_transfer)
+        data = api.get_everything(q="storm", page_size=100)
+        self.assertEqual(100, len(data["articles"]))
+
+        stats = api.last_transfer
+        self.assertTrue(stats.url.startswith(self.server.base_url + "/everything"))
+        self.assertEqual("gzip", stats.content_encoding)
+        self.assertGreater(stats.decoded_bytes, stats.wire_bytes)
+        self.assertGreater(stats.ratio, 1.0)
+
+    def test_article_projection(self):
+        api = NewsApiClient(api_key="key", session=self.session, article_fields=("title", "url", "source"))
+        data = api.get_everything(q="storm", page_size=5)
+        self.assertEqual(250, data["totalResults"])
+        for article in data["articles"]:
+            self.assertEqual({"title", "url", "source"}, set(article))
+            self.assertEqual({"id", "name"}, set(article["source"]))
+
+    def test_invalid_article_fields(self):
+        with self.assertRaises(TypeError):
+            NewsApiClient(api_key="key", article_fields="title")
+        with self.assertRaises(TypeError):
+            NewsApiClient(api_key="key", article_fields=[1, 2])
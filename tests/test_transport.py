@@ -0,0 +1,100 @@
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+import zlib
+
+from newsapi import const
+from newsapi.newsapi_client import NewsApiClient
+from newsapi.transport import RecordingTransport, ReplayTransport
+from tests.fakes import FakeResponse, FakeSession
+
+
+def numbering_session():
+    """Number each successful response, with headers describing a gzip-encoded body."""
+
+    def respond(url, params):
+        return FakeResponse(
+            '{"status": "ok", "totalResults": 1, "articles": [{"n": %d}]}' % session.calls,
+            headers={"Content-Type": "application/json", "Content-Encoding": "gzip"},
+        )
+
+    session = FakeSession(respond)
+    return session
+
+
+class TransportTest(unittest.TestCase):
+    def setUp(self):
+        tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmp_dir)
+        self.path = os.path.join(tmp_dir, "cassette.jsonl.gz")
+
+        session = numbering_session()
+        with RecordingTransport(self.path, session=session) as transport:
+            recorder = NewsApiClient(api_key="secret", session=transport)
+            recorder.get_everything(q="bitcoin", page=1)
+            recorder.get_everything(q="bitcoin", page=1)
+            recorder.get_sources(category="health")
+        self.assertEqual(3, session.calls)
+
+    def test_replay_matches_requests(self):
+        replay = ReplayTransport(self.path)
+        self.assertEqual(3, len(replay))
+        api = NewsApiClient(api_key="secret", session=replay)
+
+        # Identical requests replay in recorded order, then start over.
+        self.assertEqual([{"n": 1}], api.get_everything(page=1, q="bitcoin")["articles"])
+        self.assertEqual([{"n": 2}], api.get_everything(page=1, q="bitcoin")["articles"])
+        self.assertEqual([{"n": 1}], api.get_everything(page=1, q="bitcoin")["articles"])
+        self.assertEqual([{"n": 3}], api.get_sources(category="health")["articles"])
+
+        with self.assertRaises(LookupError):
+            api.get_everything(q="bitcoin", page=2)
+
+    def test_cassette_omits_secrets_and_wire_headers(self):
+        response = ReplayTransport(self.path).get(const.SOURCES_URL, params={"category": "health", "language": None})
+        self.assertEqual({"Content-Type": "application/json"}, response.headers)
+        with open(self.path, "rb") as f:
+            self.assertNotIn(b"secret", f.read())
+
+    def test_recording_is_one_gzip_stream(self):
+        with open(self.path, "rb") as f:
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            lines = decompressor.decompress(f.read()).splitlines()
+        self.assertEqual(b"", decompressor.unused_data)
+        started = [json.loads(line.decode("utf-8"))["started"] for line in lines]
+        self.assertEqual(sorted(started), started)
+
+    def test_unclosed_recording_is_readable(self):
+        transport = RecordingTransport(self.path, session=numbering_session())
+        NewsApiClient(api_key="secret", session=transport).get_everything(q="bitcoin", page=2)
+        self.assertEqual(4, len(ReplayTransport(self.path)))
+        transport.close()
+        self.assertEqual(4, len(ReplayTransport(self.path)))
+
+    def test_replay_with_original_gaps(self):
+        replay = ReplayTransport(self.path, pace=True)
+        for entries in replay._entries.values():
+            for entry in entries:
+                entry["started"] = 0.3 if "sources" in entry["url"] else 0.0
+        start = time.time()
+        # The first request sets the origin and is never held back; the margin is the whole gap.
+        replay.get(const.EVERYTHING_URL, params={"q": "bitcoin", "page": 1})
+        self.assertLess(time.time() - start, 0.3)
+        replay.get(const.SOURCES_URL, params={"category": "health", "language": None})
+        self.assertGreaterEqual(time.time() - start, 0.3)
+
+    def test_replay_with_original_timing(self):
+        replay = ReplayTransport(self.path, speed=1.0)
+        for entries in replay._entries.values():
+            for entry in entries:
+                entry["elapsed"] = 0.05
+        start = time.time()
+        replay.get(const.SOURCES_URL, params={"category": "health", "language": None})
+        self.assertGreaterEqual(time.time() - start, 0.05)
+
+    def test_invalid_speed(self):
+        with self.assertRaises(ValueError):
+            ReplayTransport(self.path, speed=0)